@@ -6,9 +6,46 @@ import asyncio
 import logging
 import sys
 
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_LOG_LEVEL = "WARNING"
+
+
+def _serve(transport: str, host: str, port: int, log_level: str) -> None:
+    """Configure logging and run the MCP server until it exits."""
+    logging.basicConfig(
+        level=getattr(logging, log_level.upper(), logging.WARNING),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+
+    from .server import mcp
+
+    run_kwargs: dict = {"transport": transport}
+    if transport in ("sse", "streamable-http"):
+        run_kwargs["host"] = host
+        run_kwargs["port"] = port
+        # Network transports serve many concurrent requests; prefer uvloop's
+        # faster event loop when the optional dependency is installed.
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            uvloop.run(mcp.run_async(**run_kwargs))
+            return
+
+    asyncio.run(mcp.run_async(**run_kwargs))
+
 
 def main() -> None:
     """Run the Bitbucket DC MCP server (stdio transport by default)."""
+    if len(sys.argv) == 1:
+        # Bare `uvx mcp-bitbucket-dc` (how IDEs launch us): no options to parse,
+        # so skip importing and building the click CLI.
+        _serve("stdio", DEFAULT_HOST, DEFAULT_PORT, DEFAULT_LOG_LEVEL)
+        return
+
     import click
 
     @click.command()
@@ -18,24 +55,11 @@ def main() -> None:
         default="stdio",
         help="MCP transport protocol",
     )
-    @click.option("--host", default="127.0.0.1", help="Host to bind (SSE/HTTP only)")
-    @click.option("--port", default=8000, type=int, help="Port to bind (SSE/HTTP only)")
-    @click.option("--log-level", default="WARNING", help="Logging level")
+    @click.option("--host", default=DEFAULT_HOST, help="Host to bind (SSE/HTTP only)")
+    @click.option("--port", default=DEFAULT_PORT, type=int, help="Port to bind (SSE/HTTP only)")
+    @click.option("--log-level", default=DEFAULT_LOG_LEVEL, help="Logging level")
     def run(transport: str, host: str, port: int, log_level: str) -> None:
-        logging.basicConfig(
-            level=getattr(logging, log_level.upper(), logging.WARNING),
-            format="%(asctime)s %(levelname)s %(name)s: %(message)s",
-            stream=sys.stderr,
-        )
-
-        from .server import mcp
-
-        run_kwargs: dict = {"transport": transport}
-        if transport in ("sse", "streamable-http"):
-            run_kwargs["host"] = host
-            run_kwargs["port"] = port
-
-        asyncio.run(mcp.run_async(**run_kwargs))
+        _serve(transport, host, port, log_level)
 
     run()
 
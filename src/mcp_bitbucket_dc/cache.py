@@ -0,0 +1,56 @@
+"""Small in-memory TTL cache for read-only Bitbucket responses."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire ``ttl`` seconds after being stored.
+
+    When full, the oldest entry is evicted. Keys are tuples whose second item is
+    the request path, which is what ``invalidate_prefix`` matches against.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: OrderedDict[tuple[Any, ...], tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple[Any, ...]) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: tuple[Any, ...], value: Any) -> None:
+        """Store a value, evicting the oldest entry if the cache is full."""
+        self._entries.pop(key, None)
+        self._entries[key] = (self._clock() + self.ttl, value)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        """Drop every entry whose request path starts with ``prefix``."""
+        stale = [key for key in self._entries if key[1].startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -2,15 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Optional
+from collections.abc import AsyncIterator, Awaitable, Callable
+from importlib.util import find_spec
+from typing import Any, Optional, TypeVar
 
 import httpx
 
+from .cache import TTLCache
 from .config import BitbucketConfig
+from .jsonutil import dumps, loads
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# One client serves every tool call for the server's lifetime, so keep enough
+# warm connections around for parallel tool calls to skip the TLS handshake.
+_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=30.0,
+)
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed (the
+# "speedups" extra); multiplexing lets parallel tool calls share one socket.
+_HTTP2 = find_spec("h2") is not None
+
+
+def _request_key(kind: str, path: str, params: Optional[dict[str, Any]]) -> tuple[Any, ...]:
+    """Build a hashable key identifying a read request."""
+    return (kind, path, tuple(sorted(params.items())) if params else ())
+
 
 class BitbucketClientError(Exception):
     """Raised when a Bitbucket API request fails."""
@@ -36,20 +60,50 @@ class BitbucketClient:
                 "Accept": "application/json",
             },
             timeout=httpx.Timeout(30.0, connect=10.0),
+            # Configure pooling on the client rather than passing a transport, so
+            # httpx still mounts proxies from HTTP(S)_PROXY / NO_PROXY.
+            http2=_HTTP2,
+            limits=_POOL_LIMITS,
         )
+        self._inflight: dict[tuple[Any, ...], asyncio.Future[Any]] = {}
+        self._cache = TTLCache(config.cache_ttl) if config.cache_ttl > 0 else None
 
     async def close(self) -> None:
         """Close the underlying HTTP client."""
         await self._client.aclose()
 
+    async def __aenter__(self) -> BitbucketClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
     # ── Core HTTP methods ───────────────────────────────────────────────────
 
     async def get(
         self,
         path: str,
         params: Optional[dict[str, Any]] = None,
+        *,
+        cacheable: bool = False,
     ) -> dict[str, Any]:
-        """Make a GET request to the Bitbucket API."""
+        """Make a GET request to the Bitbucket API.
+
+        With ``cacheable=True`` the response is kept for ``config.cache_ttl``
+        seconds; only pass it for read-only tools that can tolerate that staleness.
+        """
+        key = _request_key("json", path, params)
+        cache = self._cache if cacheable else None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        data = await self._singleflight(key, self._get_json, path, params)
+        if cache is not None:
+            cache.set(key, data)
+        return data
+
+    async def _get_json(self, path: str, params: Optional[dict[str, Any]]) -> dict[str, Any]:
         response = await self._client.get(path, params=params)
         return self._handle_response(response)
 
@@ -58,10 +112,31 @@ class BitbucketClient:
         path: str,
         json: Optional[dict[str, Any]] = None,
         params: Optional[dict[str, Any]] = None,
+        *,
+        cacheable: bool = False,
     ) -> dict[str, Any]:
-        """Make a POST request to the Bitbucket API."""
-        response = await self._client.post(path, json=json, params=params)
-        return self._handle_response(response)
+        """Make a POST request to the Bitbucket API.
+
+        ``cacheable=True`` marks a read-only POST (such as code search): its
+        response is cached by request body like a cacheable GET, and it does
+        not invalidate anything.
+        """
+        # The client already sends Content-Type: application/json, so hand httpx
+        # pre-encoded bytes rather than letting it run the stdlib encoder.
+        content = dumps(json) if json is not None else None
+        cache = self._cache if cacheable else None
+        if cache is not None:
+            key = (*_request_key("post", path, params), content)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        response = await self._client.post(path, content=content, params=params)
+        if not cacheable:
+            self._invalidate(path)
+        data = self._handle_response(response)
+        if cache is not None:
+            cache.set(key, data)
+        return data
 
     async def put(
         self,
@@ -69,23 +144,65 @@ class BitbucketClient:
         json: Optional[dict[str, Any]] = None,
     ) -> dict[str, Any]:
         """Make a PUT request to the Bitbucket API."""
-        response = await self._client.put(path, json=json)
+        content = dumps(json) if json is not None else None
+        response = await self._client.put(path, content=content)
+        self._invalidate(path)
         return self._handle_response(response)
 
     async def delete(self, path: str) -> dict[str, Any]:
         """Make a DELETE request to the Bitbucket API."""
         response = await self._client.delete(path)
+        self._invalidate(path)
         return self._handle_response(response)
 
-    async def get_raw(
+    async def stream_raw(
         self,
         path: str,
         params: Optional[dict[str, Any]] = None,
-    ) -> str:
-        """Make a GET request and return raw text (for file content)."""
-        response = await self._client.get(path, params=params)
-        self._check_errors(response)
-        return response.text
+        chunk_size: int = 65536,
+    ) -> AsyncIterator[str]:
+        """Stream a raw (non-JSON) response body as decoded text chunks."""
+        async with self._client.stream("GET", path, params=params) as response:
+            if not response.is_success:
+                await response.aread()
+                self._check_errors(response)
+            async for chunk in response.aiter_text(chunk_size):
+                yield chunk
+
+    async def _singleflight(
+        self,
+        key: tuple[Any, ...],
+        fetch: Callable[[str, Optional[dict[str, Any]]], Awaitable[_T]],
+        path: str,
+        params: Optional[dict[str, Any]],
+    ) -> _T:
+        """Share one in-flight GET between concurrent callers asking for the same thing.
+
+        Parallel tool calls often hit the same endpoint with the same parameters;
+        the first caller issues the request and the rest await its result.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch(path, params))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller giving up does not cancel the request for the others.
+        return await asyncio.shield(future)
+
+    def _invalidate(self, path: str) -> None:
+        """Drop cached reads a write to ``path`` may have made stale.
+
+        Writes under a project invalidate everything cached for that project;
+        any other write only invalidates reads of the same path.
+        """
+        if self._cache is None:
+            return
+        head, sep, tail = path.partition("/projects/")
+        if sep:
+            project_key = tail.partition("/")[0]
+            self._cache.invalidate_prefix(f"{head}/projects/{project_key}")
+        else:
+            self._cache.invalidate_prefix(path)
 
     # ── Convenience: REST API paths ─────────────────────────────────────────
 
@@ -99,12 +216,92 @@ class BitbucketClient:
         params: Optional[dict[str, Any]] = None,
         start: int = 0,
         limit: int = 25,
+        *,
+        max_pages: int = 1,
+        cacheable: bool = False,
+    ) -> dict[str, Any]:
+        """Make a GET request with pagination parameters.
+
+        With ``max_pages`` > 1, up to that many consecutive pages of ``limit``
+        items are fetched concurrently and merged (see ``get_paged_parallel``).
+        """
+        if max_pages > 1:
+            return await self.get_paged_parallel(
+                path,
+                params=params,
+                start=start,
+                limit=limit * max_pages,
+                page_size=limit,
+                cacheable=cacheable,
+            )
+        page = {"start": start, "limit": limit}
+        return await self.get(
+            path, params={**params, **page} if params else page, cacheable=cacheable
+        )
+
+    async def get_paged_parallel(
+        self,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        start: int = 0,
+        limit: int = 25,
+        page_size: int = 1000,
+        max_concurrency: int = 8,
+        *,
+        cacheable: bool = False,
     ) -> dict[str, Any]:
-        """Make a GET request with pagination parameters."""
-        p = dict(params or {})
-        p["start"] = start
-        p["limit"] = limit
-        return await self.get(path, params=p)
+        """Fetch ``limit`` items as concurrent ``page_size`` requests and merge them.
+
+        The first page is fetched on its own; the remaining pages are only
+        requested, concurrently, if it reports more results. Only suitable for
+        endpoints whose ``start`` is a plain item offset (such as ``/files``).
+        If the server returns a short page before the end, merging stops there
+        and ``nextPageStart`` points at the first item not returned, so callers
+        can continue from it as with a normal page.
+        """
+        if limit <= page_size:
+            return await self.get_paged(
+                path, params=params, start=start, limit=limit, cacheable=cacheable
+            )
+
+        end = start + limit
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(offset: int) -> dict[str, Any]:
+            async with semaphore:
+                return await self.get_paged(
+                    path,
+                    params=params,
+                    start=offset,
+                    limit=min(page_size, end - offset),
+                    cacheable=cacheable,
+                )
+
+        offsets = range(start, end, page_size)
+        first = await fetch(start)
+        pages = [first]
+        if not first.get("isLastPage", True) and first.get("nextPageStart") == start + page_size:
+            pages += await asyncio.gather(*map(fetch, offsets[1:]))
+
+        values: list[Any] = []
+        last: dict[str, Any] = {}
+        for offset, page in zip(offsets, pages):
+            values.extend(page.get("values", []))
+            last = page
+            expected_next = min(offset + page_size, end)
+            if page.get("isLastPage", True) or page.get("nextPageStart") != expected_next:
+                break
+
+        merged: dict[str, Any] = {
+            "size": len(values),
+            "limit": limit,
+            "start": start,
+            "isLastPage": last.get("isLastPage", True),
+            "values": values,
+        }
+        if "nextPageStart" in last:
+            merged["nextPageStart"] = last["nextPageStart"]
+        return merged
 
     # ── Response handling ───────────────────────────────────────────────────
 
@@ -114,15 +311,23 @@ class BitbucketClient:
             return
 
         status = response.status_code
-        try:
-            body = response.json()
-            errors = body.get("errors", [])
-            if errors:
-                messages = "; ".join(e.get("message", str(e)) for e in errors)
-            else:
-                messages = body.get("message", response.text[:500])
-        except Exception:
-            messages = response.text[:500]
+        content = response.content
+        # Slice before decoding: proxy error pages can be large HTML documents.
+        messages = content[:500].decode("utf-8", errors="replace")
+        # Only Bitbucket's own JSON error bodies are worth parsing.
+        if content[:64].lstrip()[:1] == b"{":
+            try:
+                body = loads(content)
+            except ValueError:
+                body = None
+            if isinstance(body, dict):
+                errors = body.get("errors")
+                if errors:
+                    messages = "; ".join(
+                        e.get("message", str(e)) if isinstance(e, dict) else str(e) for e in errors
+                    )
+                else:
+                    messages = body.get("message", messages)
 
         if status == 401:
             raise BitbucketClientError(
@@ -140,4 +345,4 @@ class BitbucketClient:
         self._check_errors(response)
         if response.status_code == 204 or not response.content:
             return {}
-        return response.json()
+        return loads(response.content)
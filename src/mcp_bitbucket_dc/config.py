@@ -14,10 +14,12 @@ class BitbucketConfig:
         BITBUCKET_HOST: Domain + optional port (e.g. "git.company.se" or "git.company.se:7990")
         BITBUCKET_URL:  Full base URL alternative (e.g. "https://git.company.se")
         BITBUCKET_API_TOKEN: Personal Access Token for authentication
+        BITBUCKET_CACHE_TTL: Seconds to cache read-only lookups (default 0, disabled)
     """
 
     base_url: str
     api_token: str
+    cache_ttl: float = 0.0
 
     @classmethod
     def from_env(cls) -> BitbucketConfig:
@@ -40,13 +42,21 @@ class BitbucketConfig:
                     "Example: BITBUCKET_HOST=git.company.se"
                 )
             # Strip protocol if accidentally included
-            host = host.removeprefix("https://").removeprefix("http://")
-            base_url = f"https://{host}"
+            _, scheme_sep, bare_host = host.partition("://")
+            base_url = f"https://{bare_host if scheme_sep else host}"
 
         # Normalize: remove trailing slash
         base_url = base_url.rstrip("/")
 
-        return cls(base_url=base_url, api_token=token)
+        cache_ttl = os.environ.get("BITBUCKET_CACHE_TTL", "")
+        try:
+            ttl = float(cache_ttl) if cache_ttl else 0.0
+        except ValueError:
+            raise ValueError(
+                f"BITBUCKET_CACHE_TTL must be a number of seconds, got {cache_ttl!r}"
+            ) from None
+
+        return cls(base_url=base_url, api_token=token, cache_ttl=ttl)
 
     @property
     def rest_api_url(self) -> str:
@@ -2,85 +2,160 @@
 
 from __future__ import annotations
 
-import json
+import re
+from collections.abc import Callable, Iterable
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
 from typing import Any, Optional
 
+from .jsonutil import dumps_pretty
 
+
+@lru_cache(maxsize=4096)
 def _ts(epoch_ms: Optional[int]) -> str:
-    """Convert epoch milliseconds to readable date string."""
+    """Convert epoch milliseconds to readable date string.
+
+    Cached because rows in a page often share timestamps (bulk-updated PRs,
+    commits from one push), and the result is a pure function of the input.
+    """
     if epoch_ms is None:
         return "unknown"
     dt = datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc)
     return dt.strftime("%Y-%m-%d %H:%M UTC")
 
 
-def render_response(response_format: str, markdown: str, data: Any) -> str:
-    """Return markdown or JSON output depending on the requested format."""
+def render_response(
+    response_format: str,
+    markdown: str | Callable[[], str],
+    data: Any,
+) -> str:
+    """Return markdown or JSON output depending on the requested format.
+
+    `markdown` may be a zero-argument callable so the markdown is only built
+    when it is actually requested.
+    """
     if response_format == "json":
-        return json.dumps(data, indent=2, ensure_ascii=False)
-    return markdown
+        return dumps_pretty(data)
+    return markdown() if callable(markdown) else markdown
+
+
+# ── Row templates ───────────────────────────────────────────────────────────
+# Per-row renderers run once per list item, so they share precompiled
+# %-templates rather than rebuilding f-strings on every call.
+
+_PROJECT_ROW = "- **%s** (`%s`) — %s%s"
+_REPOSITORY_ROW = "- **%s** (`%s`) in `%s` — %s%s%s"
+_COMMIT_ROW = "- `%s` %s **%s** — %s"
+_PR_SUMMARY_ROW = "- **#%s** [%s] %s (`%s` → `%s`) by %s — %s"
+_REVIEWER_ROW = "- **%s** (`%s`)"
+
+_MORE_PROJECTS = "\n\n*More projects available — increase `start` to paginate.*"
+_MORE_REPOSITORIES = "\n\n*More repositories available — increase `start` to paginate.*"
+_MORE_COMMITS = "\n\n*More commits available — increase `start` to paginate.*"
+_MORE_PULL_REQUESTS = "\n\n*More pull requests available — increase `start` to paginate.*"
+_MORE_FILES = "\n\n*More files available — increase `start` to paginate.*"
+
+
+def _listing(header: str, rows: Iterable[str], is_last: bool, more: str) -> str:
+    """Join a list header and its rows, appending the pagination hint if needed."""
+    body = "\n".join((header, *rows))
+    return body if is_last else body + more
+
+
+# Detail views are single multi-field documents; bound format_map templates
+# keep each one a single allocation.
+_render_repository_detail = (
+    "# {name}\n\n"
+    "- **Slug:** `{slug}`\n"
+    "- **Project:** {project_name} (`{project_key}`)\n"
+    "- **State:** {state}\n"
+    "- **SCM:** {scm}\n"
+    "- **Forkable:** {forkable}\n"
+    "- **Public:** {public}\n"
+    "- **Archived:** {archived}\n"
+    "- **Description:** {description}"
+    "{clone_section}"
+).format_map
+_render_pull_request_detail = (
+    "# PR #{id} — {title}\n\n"
+    "- **State:** {state}\n"
+    "- **Author:** {author}\n"
+    "- **Branch:** `{from_ref}` → `{to_ref}`\n"
+    "- **Created:** {created}\n"
+    "- **Updated:** {updated}\n"
+    "- **Locked:** {locked}\n\n"
+    "## Description\n\n{description}\n\n"
+    "## Reviewers ({reviewer_count})\n\n"
+    "{reviewers}"
+).format_map
 
 
 # ── Projects & Repos ────────────────────────────────────────────────────────
 
 
 def format_project(p: dict[str, Any]) -> str:
-    desc = p.get("description", "") or ""
-    public = "Public" if p.get("public") else "Private"
-    return (
-        f"- **{p.get('name', '')}** (`{p.get('key', '')}`) — {public}{f' — {desc}' if desc else ''}"
+    get = p.get
+    desc = get("description") or ""
+    return _PROJECT_ROW % (
+        get("name", ""),
+        get("key", ""),
+        "Public" if get("public") else "Private",
+        f" — {desc}" if desc else "",
     )
 
 
 def format_projects(projects: list[dict[str, Any]], total: int, is_last: bool) -> str:
-    lines = [f"# Projects ({total} total)\n"]
-    lines.extend(format_project(p) for p in projects)
-    if not is_last:
-        lines.append("\n*More projects available — increase `start` to paginate.*")
-    return "\n".join(lines)
+    return _listing(
+        f"# Projects ({total} total)\n", map(format_project, projects), is_last, _MORE_PROJECTS
+    )
 
 
 def format_repository(r: dict[str, Any]) -> str:
-    state = r.get("state", "")
-    archived = " [ARCHIVED]" if r.get("archived") else ""
-    desc = r.get("description", "") or ""
-    project_key = r.get("project", {}).get("key", "")
-    return (
-        f"- **{r.get('name', '')}** (`{r.get('slug', '')}`) "
-        f"in `{project_key}` — {state}{archived}"
-        f"{f' — {desc}' if desc else ''}"
+    get = r.get
+    desc = get("description") or ""
+    return _REPOSITORY_ROW % (
+        get("name", ""),
+        get("slug", ""),
+        get("project", {}).get("key", ""),
+        get("state", ""),
+        " [ARCHIVED]" if get("archived") else "",
+        f" — {desc}" if desc else "",
     )
 
 
 def format_repositories(repos: list[dict[str, Any]], total: int, is_last: bool) -> str:
-    lines = [f"# Repositories ({total} total)\n"]
-    lines.extend(format_repository(r) for r in repos)
-    if not is_last:
-        lines.append("\n*More repositories available — increase `start` to paginate.*")
-    return "\n".join(lines)
+    return _listing(
+        f"# Repositories ({total} total)\n",
+        map(format_repository, repos),
+        is_last,
+        _MORE_REPOSITORIES,
+    )
 
 
 def format_repository_detail(r: dict[str, Any]) -> str:
-    project = r.get("project", {})
-    links = r.get("links", {})
-    clone_urls = links.get("clone", [])
+    get = r.get
+    project = get("project", {})
+    clone_urls = get("links", {}).get("clone", [])
     clone_section = ""
     if clone_urls:
         clone_section = "\n**Clone URLs:**\n" + "\n".join(
             f"  - {c.get('name', '')}: `{c.get('href', '')}`" for c in clone_urls
         )
-    return (
-        f"# {r.get('name', '')}\n\n"
-        f"- **Slug:** `{r.get('slug', '')}`\n"
-        f"- **Project:** {project.get('name', '')} (`{project.get('key', '')}`)\n"
-        f"- **State:** {r.get('state', '')}\n"
-        f"- **SCM:** {r.get('scmId', 'git')}\n"
-        f"- **Forkable:** {r.get('forkable', True)}\n"
-        f"- **Public:** {r.get('public', False)}\n"
-        f"- **Archived:** {r.get('archived', False)}\n"
-        f"- **Description:** {r.get('description', '') or 'N/A'}"
-        f"{clone_section}"
+    return _render_repository_detail(
+        {
+            "name": get("name", ""),
+            "slug": get("slug", ""),
+            "project_name": project.get("name", ""),
+            "project_key": project.get("key", ""),
+            "state": get("state", ""),
+            "scm": get("scmId", "git"),
+            "forkable": get("forkable", True),
+            "public": get("public", False),
+            "archived": get("archived", False),
+            "description": get("description", "") or "N/A",
+            "clone_section": clone_section,
+        }
     )
 
 
@@ -115,50 +190,51 @@ def format_tags(tags: list[dict[str, Any]], total: int, is_last: bool) -> str:
 
 
 def format_commit(c: dict[str, Any]) -> str:
-    author = c.get("author", {})
-    name = author.get("name", "unknown")
-    msg = (c.get("message", "") or "").split("\n")[0]  # first line only
-    ts = _ts(c.get("authorTimestamp"))
-    return f"- `{(c.get('displayId', '') or c.get('id', ''))[:12]}` {ts} **{name}** — {msg}"
+    get = c.get
+    return _COMMIT_ROW % (
+        (get("displayId") or get("id", ""))[:12],
+        _ts(get("authorTimestamp")),
+        get("author", {}).get("name", "unknown"),
+        (get("message") or "").partition("\n")[0],  # first line only
+    )
 
 
 def format_commits(commits: list[dict[str, Any]], total: int, is_last: bool) -> str:
-    lines = [f"# Commits ({total} total)\n"]
-    lines.extend(format_commit(c) for c in commits)
-    if not is_last:
-        lines.append("\n*More commits available — increase `start` to paginate.*")
-    return "\n".join(lines)
+    return _listing(
+        f"# Commits ({total} total)\n", map(format_commit, commits), is_last, _MORE_COMMITS
+    )
 
 
 # ── Pull Requests ───────────────────────────────────────────────────────────
 
 
 def format_pr_summary(pr: dict[str, Any]) -> str:
-    author = pr.get("author", {}).get("user", {})
-    author_name = author.get("displayName", author.get("name", "unknown"))
-    state = pr.get("state", "")
-    from_ref = pr.get("fromRef", {}).get("displayId", "?")
-    to_ref = pr.get("toRef", {}).get("displayId", "?")
-    return (
-        f"- **#{pr.get('id', '')}** [{state}] {pr.get('title', '')} "
-        f"(`{from_ref}` → `{to_ref}`) by {author_name} — {_ts(pr.get('updatedDate'))}"
+    get = pr.get
+    author = get("author", {}).get("user", {})
+    return _PR_SUMMARY_ROW % (
+        get("id", ""),
+        get("state", ""),
+        get("title", ""),
+        get("fromRef", {}).get("displayId", "?"),
+        get("toRef", {}).get("displayId", "?"),
+        author.get("displayName", author.get("name", "unknown")),
+        _ts(get("updatedDate")),
     )
 
 
 def format_pull_requests(prs: list[dict[str, Any]], total: int, is_last: bool) -> str:
-    lines = [f"# Pull Requests ({total} total)\n"]
-    lines.extend(format_pr_summary(pr) for pr in prs)
-    if not is_last:
-        lines.append("\n*More pull requests available — increase `start` to paginate.*")
-    return "\n".join(lines)
+    return _listing(
+        f"# Pull Requests ({total} total)\n",
+        map(format_pr_summary, prs),
+        is_last,
+        _MORE_PULL_REQUESTS,
+    )
 
 
 def format_pull_request_detail(pr: dict[str, Any]) -> str:
-    author = pr.get("author", {}).get("user", {})
-    author_name = author.get("displayName", author.get("name", "unknown"))
-    from_ref = pr.get("fromRef", {})
-    to_ref = pr.get("toRef", {})
-    reviewers = pr.get("reviewers", [])
+    get = pr.get
+    author = get("author", {}).get("user", {})
+    reviewers = get("reviewers", [])
 
     reviewer_lines = []
     for r in reviewers:
@@ -166,17 +242,21 @@ def format_pull_request_detail(pr: dict[str, Any]) -> str:
         status = "✅ Approved" if r.get("approved") else f"({r.get('status', 'UNAPPROVED')})"
         reviewer_lines.append(f"  - {user.get('displayName', user.get('name', ''))} {status}")
 
-    return (
-        f"# PR #{pr.get('id', '')} — {pr.get('title', '')}\n\n"
-        f"- **State:** {pr.get('state', '')}\n"
-        f"- **Author:** {author_name}\n"
-        f"- **Branch:** `{from_ref.get('displayId', '?')}` → `{to_ref.get('displayId', '?')}`\n"
-        f"- **Created:** {_ts(pr.get('createdDate'))}\n"
-        f"- **Updated:** {_ts(pr.get('updatedDate'))}\n"
-        f"- **Locked:** {pr.get('locked', False)}\n\n"
-        f"## Description\n\n{pr.get('description', '') or 'No description.'}\n\n"
-        f"## Reviewers ({len(reviewers)})\n\n"
-        + ("\n".join(reviewer_lines) if reviewer_lines else "No reviewers assigned.")
+    return _render_pull_request_detail(
+        {
+            "id": get("id", ""),
+            "title": get("title", ""),
+            "state": get("state", ""),
+            "author": author.get("displayName", author.get("name", "unknown")),
+            "from_ref": get("fromRef", {}).get("displayId", "?"),
+            "to_ref": get("toRef", {}).get("displayId", "?"),
+            "created": _ts(get("createdDate")),
+            "updated": _ts(get("updatedDate")),
+            "locked": get("locked", False),
+            "description": get("description", "") or "No description.",
+            "reviewer_count": len(reviewers),
+            "reviewers": "\n".join(reviewer_lines) or "No reviewers assigned.",
+        }
     )
 
 
@@ -211,9 +291,10 @@ def format_pr_activities(activities: list[dict[str, Any]], total: int, is_last:
             anchor = comment.get("anchor")
             location = ""
             if anchor and anchor.get("path"):
-                location = f" on `{anchor['path']}`"
-                if anchor.get("line"):
-                    location += f" line {anchor['line']}"
+                line = anchor.get("line")
+                location = (
+                    f" on `{anchor['path']}` line {line}" if line else f" on `{anchor['path']}`"
+                )
             lines.append(f"### {action} by {user_name} — {ts}{location}\n\n{text}\n")
         else:
             lines.append(f"- **{action}** by {user_name} — {ts}")
@@ -223,9 +304,28 @@ def format_pr_activities(activities: list[dict[str, Any]], total: int, is_last:
     return "\n".join(lines)
 
 
+def format_required_reviewers(conditions: list[dict[str, Any]]) -> str:
+    lines = ["# Required Reviewers\n"]
+    append = lines.append
+    for cond in conditions:
+        for r in cond.get("reviewers", ()):
+            get = r.get
+            append(_REVIEWER_ROW % (get("displayName", get("name", "unknown")), get("name", "")))
+        required_approvals = cond.get("requiredApprovals", 0)
+        if required_approvals:
+            append(f"\n*Required approvals: {required_approvals}*")
+    if len(lines) == 1:
+        append("No required reviewers configured for this branch combination.")
+    return "\n".join(lines)
+
+
 # ── File Browsing ───────────────────────────────────────────────────────────
 
 
+_get_text = itemgetter("text")
+_first = itemgetter(0)
+
+
 def format_browse(data: dict[str, Any], path: str) -> str:
     """Format the browse API response (directory listing or file content)."""
     children = data.get("children")
@@ -236,16 +336,17 @@ def format_browse(data: dict[str, Any], path: str) -> str:
         is_last = children.get("isLastPage", True)
         display_path = path or "/"
         lines = [f"# Browse: `{display_path}` ({total} entries)\n"]
+        append = lines.append
         for entry in values:
             entry_path = entry.get("path", {})
-            name = entry_path.get("toString", entry_path.get("name", "?"))
-            entry_type = entry.get("type", "")
+            name = entry_path.get("toString")
+            if name is None:
+                name = entry_path.get("name", "?")
+            if entry.get("type") == "DIRECTORY":
+                append(f"- 📁 `{name}/`")
+                continue
             size = entry.get("size")
-            if entry_type == "DIRECTORY":
-                lines.append(f"- 📁 `{name}/`")
-            else:
-                size_str = f" ({_format_size(size)})" if size is not None else ""
-                lines.append(f"- 📄 `{name}`{size_str}")
+            append(f"- 📄 `{name}`" if size is None else f"- 📄 `{name}` ({_format_size(size)})")
         if not is_last:
             lines.append("\n*More entries available — increase `start` to paginate.*")
         return "\n".join(lines)
@@ -253,32 +354,37 @@ def format_browse(data: dict[str, Any], path: str) -> str:
     # File content
     file_lines = data.get("lines", [])
     if file_lines:
-        content_lines = [f"# File: `{path}`\n\n```"]
-        for line_obj in file_lines:
-            content_lines.append(line_obj.get("text", ""))
-        content_lines.append("```")
-        return "\n".join(content_lines)
+        try:
+            texts = list(map(_get_text, file_lines))
+        except KeyError:
+            texts = [line_obj.get("text", "") for line_obj in file_lines]
+        return "\n".join((f"# File: `{path}`\n\n```", *texts, "```"))
 
     return f"# Browse: `{path}`\n\nEmpty or binary file."
 
 
 def format_file_list(files: list[str], path: str, total: int, is_last: bool) -> str:
     display_path = path or "/"
-    lines = [f"# Files in `{display_path}` ({total} total)\n"]
-    lines.extend(f"- `{f}`" for f in files)
-    if not is_last:
-        lines.append("\n*More files available — increase `start` to paginate.*")
-    return "\n".join(lines)
+    return _listing(
+        f"# Files in `{display_path}` ({total} total)\n",
+        map("- `{}`".format, files),
+        is_last,
+        _MORE_FILES,
+    )
+
+
+_KB = 1024
+_MB = 1024 * 1024
 
 
 def _format_size(size_bytes: Optional[int]) -> str:
     if size_bytes is None:
         return ""
-    if size_bytes < 1024:
+    if size_bytes < _KB:
         return f"{size_bytes} B"
-    if size_bytes < 1024 * 1024:
-        return f"{size_bytes / 1024:.1f} KB"
-    return f"{size_bytes / (1024 * 1024):.1f} MB"
+    if size_bytes < _MB:
+        return f"{size_bytes / _KB:.1f} KB"
+    return f"{size_bytes / _MB:.1f} MB"
 
 
 # ── Code Search ─────────────────────────────────────────────────────────────
@@ -306,24 +412,24 @@ def format_search_results(
         repo_name = repo.get("name", "")
         project_key = project.get("key", "")
 
-        section = (
+        parts = [
             f"## {i}. {file_path}\n"
             f"**Project:** {project_key} | **Repository:** {repo_name} | "
             f"**Matches:** {hit_count}\n\n"
-        )
+        ]
+        append = parts.append
 
         hit_contexts = result.get("hitContexts", [])
         blocks = _extract_context_blocks(hit_contexts)
         for j, block in enumerate(blocks):
             if j > 0:
-                section += "---\n\n"
-            section += "```\n"
+                append("---\n\n")
+            append("```\n")
             for ctx in block:
-                text = _clean_html(ctx.get("text", ""))
-                section += f"{ctx.get('line', 0):4d}    {text}\n"
-            section += "```\n\n"
+                append(f"{ctx.get('line', 0):4d}    {_clean_html(ctx.get('text', ''))}\n")
+            append("```\n\n")
 
-        sections.append(section)
+        sections.append("".join(parts))
 
     return header + "\n---\n\n".join(sections) + "\n---\n\n*Search completed*"
 
@@ -332,36 +438,40 @@ def _extract_context_blocks(
     hit_contexts: list[list[dict[str, Any]]],
 ) -> list[list[dict[str, Any]]]:
     """Group all hit contexts into displayable blocks of consecutive lines."""
-    all_contexts = []
-    for group in hit_contexts:
-        all_contexts.extend(group)
-
-    if not all_contexts:
+    # Pair each context with its line number once so sorting and grouping
+    # never touch the dicts again.
+    pairs = [(ctx.get("line", 0), ctx) for group in hit_contexts for ctx in group]
+    if not pairs:
         return []
+    pairs.sort(key=_first)
 
-    # Sort by line number
-    sorted_ctx = sorted(all_contexts, key=lambda c: c.get("line", 0))
-
+    last_line, first_ctx = pairs[0]
     blocks: list[list[dict[str, Any]]] = []
-    current: list[dict[str, Any]] = [sorted_ctx[0]]
-
-    for ctx in sorted_ctx[1:]:
-        if ctx.get("line", 0) - current[-1].get("line", 0) <= 3:
+    current: list[dict[str, Any]] = [first_ctx]
+    for line, ctx in pairs[1:]:
+        if line - last_line <= 3:
             current.append(ctx)
         else:
             blocks.append(current)
             current = [ctx]
+        last_line = line
     blocks.append(current)
     return blocks
 
 
+_HTML_REPLACEMENTS = {
+    "<em>": "",
+    "</em>": "",
+    "&quot;": '"',
+    "&lt;": "<",
+    "&gt;": ">",
+    "&amp;": "&",
+}
+_HTML_RE = re.compile("|".join(map(re.escape, _HTML_REPLACEMENTS)))
+
+
 def _clean_html(text: str) -> str:
     """Strip HTML tags and entities from search result text."""
-    return (
-        text.replace("<em>", "")
-        .replace("</em>", "")
-        .replace("&quot;", '"')
-        .replace("&lt;", "<")
-        .replace("&gt;", ">")
-        .replace("&amp;", "&")
-    )
+    if "<" not in text and "&" not in text:
+        return text
+    return _HTML_RE.sub(lambda m: _HTML_REPLACEMENTS[m.group(0)], text)
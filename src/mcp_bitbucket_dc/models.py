@@ -1,15 +1,32 @@
-"""Pydantic models for Bitbucket Data Center API responses."""
+"""Pydantic models for Bitbucket Data Center API responses.
+
+These models document response shapes. Tools deliberately pass raw response
+dicts to the formatters instead of validating them, because the payloads are
+trusted Bitbucket API output and per-row validation is the dominant cost on
+large pages.
+"""
 
 from __future__ import annotations
 
 from typing import Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BitbucketModel(BaseModel):
+    """Base for Bitbucket response models.
+
+    Responses carry many fields these models do not declare; they are ignored.
+    Instances are immutable and accept either field names or API aliases.
+    """
+
+    model_config = ConfigDict(extra="ignore", populate_by_name=True, frozen=True)
+
 
 # ── Pagination ──────────────────────────────────────────────────────────────
 
 
-class PagedResponse(BaseModel):
+class PagedResponse(BitbucketModel):
     """Generic paginated response wrapper from Bitbucket DC REST API."""
 
     size: int = 0
@@ -23,7 +40,7 @@ class PagedResponse(BaseModel):
 # ── Projects ────────────────────────────────────────────────────────────────
 
 
-class Project(BaseModel):
+class Project(BitbucketModel):
     key: str
     id: int
     name: str
@@ -35,7 +52,7 @@ class Project(BaseModel):
 # ── Repositories ────────────────────────────────────────────────────────────
 
 
-class Repository(BaseModel):
+class Repository(BitbucketModel):
     slug: str
     id: int
     name: str
@@ -52,7 +69,7 @@ class Repository(BaseModel):
 # ── Branches & Tags ────────────────────────────────────────────────────────
 
 
-class Ref(BaseModel):
+class Ref(BitbucketModel):
     """Branch or tag reference."""
 
     id: str
@@ -65,12 +82,12 @@ class Ref(BaseModel):
 # ── Commits ─────────────────────────────────────────────────────────────────
 
 
-class CommitAuthor(BaseModel):
+class CommitAuthor(BitbucketModel):
     name: str = ""
     email_address: str = Field("", alias="emailAddress")
 
 
-class Commit(BaseModel):
+class Commit(BitbucketModel):
     id: str
     display_id: str = Field("", alias="displayId")
     message: str = ""
@@ -82,28 +99,28 @@ class Commit(BaseModel):
 # ── Pull Requests ───────────────────────────────────────────────────────────
 
 
-class PullRequestRef(BaseModel):
+class PullRequestRef(BitbucketModel):
     id: str
     display_id: str = Field("", alias="displayId")
     latest_commit: Optional[str] = Field(None, alias="latestCommit")
     repository: Optional[Repository] = None
 
 
-class PullRequestUser(BaseModel):
+class PullRequestUser(BitbucketModel):
     name: str = ""
     display_name: str = Field("", alias="displayName")
     email_address: Optional[str] = Field(None, alias="emailAddress")
     slug: Optional[str] = None
 
 
-class PullRequestParticipant(BaseModel):
+class PullRequestParticipant(BitbucketModel):
     user: PullRequestUser
     role: str = ""
     approved: bool = False
     status: str = ""
 
 
-class PullRequest(BaseModel):
+class PullRequest(BitbucketModel):
     id: int
     title: str = ""
     description: Optional[str] = None
@@ -120,7 +137,7 @@ class PullRequest(BaseModel):
 # ── PR Changes / Diff ──────────────────────────────────────────────────────
 
 
-class PathInfo(BaseModel):
+class PathInfo(BitbucketModel):
     """File path information in a PR change."""
 
     components: list[str] = []
@@ -128,7 +145,7 @@ class PathInfo(BaseModel):
     to_string: str = Field("", alias="toString")
 
 
-class PullRequestChange(BaseModel):
+class PullRequestChange(BitbucketModel):
     content_id: str = Field("", alias="contentId")
     from_content_id: str = Field("", alias="fromContentId")
     path: Optional[PathInfo] = None
@@ -140,14 +157,14 @@ class PullRequestChange(BaseModel):
 # ── PR Comments / Activities ───────────────────────────────────────────────
 
 
-class CommentAnchor(BaseModel):
+class CommentAnchor(BitbucketModel):
     path: Optional[str] = None
     line: Optional[int] = None
     line_type: Optional[str] = Field(None, alias="lineType")
     file_type: Optional[str] = Field(None, alias="fileType")
 
 
-class Comment(BaseModel):
+class Comment(BitbucketModel):
     id: int
     text: str = ""
     author: Optional[PullRequestUser] = None
@@ -163,7 +180,7 @@ class Comment(BaseModel):
 Comment.model_rebuild()
 
 
-class Activity(BaseModel):
+class Activity(BitbucketModel):
     id: int
     action: str = ""
     comment: Optional[Comment] = None
@@ -174,7 +191,7 @@ class Activity(BaseModel):
 # ── File Browsing ───────────────────────────────────────────────────────────
 
 
-class FileNode(BaseModel):
+class FileNode(BitbucketModel):
     """A file or directory entry from the browse endpoint."""
 
     path: Optional[PathInfo] = None
@@ -183,7 +200,7 @@ class FileNode(BaseModel):
     size: Optional[int] = None
 
 
-class BrowseResponse(BaseModel):
+class BrowseResponse(BitbucketModel):
     """Response from the browse endpoint."""
 
     path: Optional[PathInfo] = None
@@ -196,17 +213,17 @@ class BrowseResponse(BaseModel):
 # ── Code Search ─────────────────────────────────────────────────────────────
 
 
-class HitContext(BaseModel):
+class HitContext(BitbucketModel):
     line: int
     text: str
 
 
-class PathMatch(BaseModel):
+class PathMatch(BitbucketModel):
     text: str
     match: Optional[bool] = None
 
 
-class SearchResult(BaseModel):
+class SearchResult(BitbucketModel):
     repository: Repository
     file: str
     hit_contexts: list[list[HitContext]] = Field([], alias="hitContexts")
@@ -214,7 +231,7 @@ class SearchResult(BaseModel):
     hit_count: int = Field(0, alias="hitCount")
 
 
-class CodeSection(BaseModel):
+class CodeSection(BitbucketModel):
     category: str = ""
     is_last_page: bool = Field(True, alias="isLastPage")
     count: int = 0
@@ -223,15 +240,15 @@ class CodeSection(BaseModel):
     values: list[SearchResult] = []
 
 
-class SearchScope(BaseModel):
+class SearchScope(BitbucketModel):
     type: str = ""
 
 
-class QueryInfo(BaseModel):
+class QueryInfo(BitbucketModel):
     substituted: bool = False
 
 
-class BitbucketSearchResponse(BaseModel):
+class BitbucketSearchResponse(BitbucketModel):
     scope: Optional[SearchScope] = None
     code: Optional[CodeSection] = None
     query: Optional[QueryInfo] = None
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
@@ -35,19 +36,31 @@ def get_client(ctx: Context) -> BitbucketClient:
 # ── Lifespan ────────────────────────────────────────────────────────────────
 
 
+async def _prewarm(client: BitbucketClient, base_url: str) -> None:
+    """Open a pooled connection (DNS, TCP, TLS) before the first tool call needs it."""
+    try:
+        await client.get("/rest/api/latest/application-properties")
+    except Exception as exc:  # best effort: tool calls report real errors themselves
+        logger.warning("Preflight request to %s failed: %s", base_url, exc)
+
+
 @asynccontextmanager
 async def lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
     """Initialize BitbucketClient on startup, close on shutdown."""
     global _client
     config = BitbucketConfig.from_env()
-    _client = BitbucketClient(config)
-    logger.info("Bitbucket DC MCP server started — connected to %s", config.base_url)
-    try:
-        yield {}
-    finally:
-        await _client.close()
-        _client = None
-        logger.info("Bitbucket DC MCP server stopped")
+    # The client is closed on the same event loop that created it.
+    async with BitbucketClient(config) as client:
+        _client = client
+        logger.info("Bitbucket DC MCP server started — connected to %s", config.base_url)
+        # Warm up in the background so an unreachable host does not delay startup.
+        warmup = asyncio.create_task(_prewarm(client, config.base_url))
+        try:
+            yield {}
+        finally:
+            warmup.cancel()
+            _client = None
+    logger.info("Bitbucket DC MCP server stopped")
 
 
 # ── Server instance ────────────────────────────────────────────────────────
@@ -7,21 +7,13 @@ from pydantic import Field
 
 from ..client import BitbucketClient
 from ..formatting import format_search_results, render_response
+from .common import READ_TAGS, read_annotations
 
 
 def register_code_search_tools(mcp, get_client) -> None:
     """Register code search tools on the MCP server."""
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Code Search",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Code Search"))
     async def bitbucket_code_search(
         ctx: Context,
         query: Annotated[
@@ -73,13 +65,16 @@ def register_code_search_tools(mcp, get_client) -> None:
         data = await client.post(
             "/rest/search/latest/search",
             json=payload,
-            params={"avatarSize": 64},
+            cacheable=True,
         )
         code_section = data.get("code", {})
-        markdown = format_search_results(
-            results=code_section.get("values", []),
-            query=query,
-            total=code_section.get("count", 0),
-            is_last=code_section.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_search_results(
+                results=code_section.get("values", []),
+                query=query,
+                total=code_section.get("count", 0),
+                is_last=code_section.get("isLastPage", True),
+            ),
+            code_section,
         )
-        return render_response(response_format, markdown, code_section)
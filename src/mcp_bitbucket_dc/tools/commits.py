@@ -7,21 +7,15 @@ from pydantic import Field
 
 from ..client import BitbucketClient
 from ..formatting import format_commits, render_response
+from .common import READ_TAGS, query_params, read_annotations
+
+_COMMITS = "/rest/api/latest/projects/%s/repos/%s/commits"
 
 
 def register_commit_tools(mcp, get_client) -> None:
     """Register commit tools on the MCP server."""
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Commits",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Commits"))
     async def bitbucket_get_commits(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -54,22 +48,20 @@ def register_commit_tools(mcp, get_client) -> None:
         that modified a specific file.
         """
         client: BitbucketClient = get_client(ctx)
-        params: dict = {}
-        if path:
-            params["path"] = path
-        if since:
-            params["since"] = since
-        if until:
-            params["until"] = until
+        params = query_params(path=path, since=since, until=until)
         data = await client.get_paged(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/commits",
+            _COMMITS % (project_key, repository_slug),
             params=params,
             start=start,
             limit=limit,
+            cacheable=True,
         )
-        markdown = format_commits(
-            data.get("values", []),
-            total=data.get("size", 0),
-            is_last=data.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_commits(
+                data.get("values", []),
+                total=data.get("size", 0),
+                is_last=data.get("isLastPage", True),
+            ),
+            data,
         )
-        return render_response(response_format, markdown, data)
@@ -0,0 +1,37 @@
+"""Helpers shared by the tool modules."""
+
+from typing import Any
+
+
+def query_params(**params: Any) -> dict[str, Any]:
+    """Build query parameters, leaving out unset (None or empty-string) values."""
+    return {key: value for key, value in params.items() if value is not None and value != ""}
+
+
+# ── Tool metadata ───────────────────────────────────────────────────────────
+
+READ_TAGS = frozenset({"bitbucket", "read"})
+WRITE_TAGS = frozenset({"bitbucket", "write"})
+
+_READ_HINTS = {
+    "readOnlyHint": True,
+    "destructiveHint": False,
+    "idempotentHint": True,
+    "openWorldHint": True,
+}
+_WRITE_HINTS = {
+    "readOnlyHint": False,
+    "destructiveHint": True,
+    "idempotentHint": False,
+    "openWorldHint": True,
+}
+
+
+def read_annotations(title: str) -> dict[str, Any]:
+    """Tool annotations for a read-only Bitbucket tool."""
+    return {"title": title, **_READ_HINTS}
+
+
+def write_annotations(title: str) -> dict[str, Any]:
+    """Tool annotations for a Bitbucket tool that modifies server state."""
+    return {"title": title, **_WRITE_HINTS}
@@ -1,6 +1,8 @@
 """File browsing, content, and branch/tag MCP tools."""
 
+import io
 from typing import Annotated, Literal, Optional
+from urllib.parse import quote
 
 from fastmcp import Context
 from pydantic import Field
@@ -13,21 +15,22 @@ from ..formatting import (
     format_tags,
     render_response,
 )
+from .common import READ_TAGS, query_params, read_annotations
+
+# Endpoint templates, filled with %-formatting per call.
+_BROWSE = "/rest/api/latest/projects/%s/repos/%s/browse"
+_BROWSE_PATH = "/rest/api/latest/projects/%s/repos/%s/browse/%s"
+_RAW = "/rest/api/latest/projects/%s/repos/%s/raw/%s"
+_FILES = "/rest/api/latest/projects/%s/repos/%s/files"
+_FILES_PATH = "/rest/api/latest/projects/%s/repos/%s/files/%s"
+_BRANCHES = "/rest/api/latest/projects/%s/repos/%s/branches"
+_TAGS = "/rest/api/latest/projects/%s/repos/%s/tags"
 
 
 def register_file_tools(mcp, get_client) -> None:
     """Register file browsing and branch/tag tools on the MCP server."""
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Browse Files",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Browse Files"))
     async def bitbucket_browse(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -53,26 +56,18 @@ def register_file_tools(mcp, get_client) -> None:
         returns its content instead. Use `at` to browse a specific branch or commit.
         """
         client: BitbucketClient = get_client(ctx)
-        endpoint = f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/browse"
-        if path:
-            endpoint = f"{endpoint}/{path}"
-        params: dict = {}
-        if at:
-            params["at"] = at
-        data = await client.get_paged(endpoint, params=params, start=start, limit=limit)
-        markdown = format_browse(data, path or "/")
-        return render_response(response_format, markdown, data)
+        endpoint = (
+            _BROWSE_PATH % (project_key, repository_slug, quote(path))
+            if path
+            else _BROWSE % (project_key, repository_slug)
+        )
+        params = query_params(at=at)
+        data = await client.get_paged(
+            endpoint, params=params, start=start, limit=limit, cacheable=True
+        )
+        return render_response(response_format, lambda: format_browse(data, path or "/"), data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get File Content",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get File Content"))
     async def bitbucket_get_file_content(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -93,29 +88,31 @@ def register_file_tools(mcp, get_client) -> None:
         branch, tag, or commit hash.
         """
         client: BitbucketClient = get_client(ctx)
-        params: dict = {}
-        if at:
-            params["at"] = at
-        content = await client.get_raw(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/raw/{path}",
+        params = query_params(at=at)
+        chunks = client.stream_raw(
+            _RAW % (project_key, repository_slug, quote(path)),
             params=params,
         )
+        if response_format == "json":
+            content = "".join([chunk async for chunk in chunks])
+            return render_response(
+                response_format, "", {"path": path, "at": at, "content": content}
+            )
+
         # Determine file extension for syntax highlighting
-        ext = path.rsplit(".", 1)[-1] if "." in path else ""
-        markdown = f"# File: `{path}`\n\n```{ext}\n{content}\n```"
-        data = {"path": path, "at": at, "content": content}
-        return render_response(response_format, markdown, data)
+        _, dot, ext = path.rpartition(".")
+        if not dot:
+            ext = ""
+        # Write chunks straight into the markdown buffer so large files are not
+        # held as a full text copy and a second formatted copy at the same time.
+        buf = io.StringIO()
+        buf.write(f"# File: `{path}`\n\n```{ext}\n")
+        async for chunk in chunks:
+            buf.write(chunk)
+        buf.write("\n```")
+        return buf.getvalue()
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "List Files",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("List Files"))
     async def bitbucket_list_files(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -141,31 +138,30 @@ def register_file_tools(mcp, get_client) -> None:
         understanding the project structure or finding files by name.
         """
         client: BitbucketClient = get_client(ctx)
-        endpoint = f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/files"
-        if path:
-            endpoint = f"{endpoint}/{path}"
-        params: dict = {}
-        if at:
-            params["at"] = at
-        data = await client.get_paged(endpoint, params=params, start=start, limit=limit)
-        markdown = format_file_list(
-            data.get("values", []),
-            path=path or "/",
-            total=data.get("size", len(data.get("values", []))),
-            is_last=data.get("isLastPage", True),
+        endpoint = (
+            _FILES_PATH % (project_key, repository_slug, quote(path))
+            if path
+            else _FILES % (project_key, repository_slug)
+        )
+        params = query_params(at=at)
+        # Bitbucket caps /files pages at 1000 entries; larger limits are fetched
+        # as concurrent page requests.
+        data = await client.get_paged_parallel(
+            endpoint, params=params, start=start, limit=limit, cacheable=True
         )
+
+        def markdown() -> str:
+            values = data.get("values") or []
+            return format_file_list(
+                values,
+                path=path or "/",
+                total=data.get("size", len(values)),
+                is_last=data.get("isLastPage", True),
+            )
+
         return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Branches",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Branches"))
     async def bitbucket_get_branches(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -191,34 +187,25 @@ def register_file_tools(mcp, get_client) -> None:
         for branches by name.
         """
         client: BitbucketClient = get_client(ctx)
-        params: dict = {"details": "true"}
-        if filter_text:
-            params["filterText"] = filter_text
-        if order_by:
-            params["orderBy"] = order_by
+        params = query_params(details="true", filterText=filter_text, orderBy=order_by)
         data = await client.get_paged(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/branches",
+            _BRANCHES % (project_key, repository_slug),
             params=params,
             start=start,
             limit=limit,
+            cacheable=True,
         )
-        markdown = format_branches(
-            data.get("values", []),
-            total=data.get("size", 0),
-            is_last=data.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_branches(
+                data.get("values", []),
+                total=data.get("size", 0),
+                is_last=data.get("isLastPage", True),
+            ),
+            data,
         )
-        return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Tags",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Tags"))
     async def bitbucket_get_tags(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -244,20 +231,20 @@ def register_file_tools(mcp, get_client) -> None:
         for tags by name.
         """
         client: BitbucketClient = get_client(ctx)
-        params: dict = {}
-        if filter_text:
-            params["filterText"] = filter_text
-        if order_by:
-            params["orderBy"] = order_by
+        params = query_params(filterText=filter_text, orderBy=order_by)
         data = await client.get_paged(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/tags",
+            _TAGS % (project_key, repository_slug),
             params=params,
             start=start,
             limit=limit,
+            cacheable=True,
         )
-        markdown = format_tags(
-            data.get("values", []),
-            total=data.get("size", 0),
-            is_last=data.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_tags(
+                data.get("values", []),
+                total=data.get("size", 0),
+                is_last=data.get("isLastPage", True),
+            ),
+            data,
         )
-        return render_response(response_format, markdown, data)
@@ -7,21 +7,16 @@ from pydantic import Field
 
 from ..client import BitbucketClient
 from ..formatting import format_project, format_projects, render_response
+from .common import READ_TAGS, query_params, read_annotations
+
+_PROJECTS = "/rest/api/latest/projects"
+_PROJECT = "/rest/api/latest/projects/%s"
 
 
 def register_project_tools(mcp, get_client) -> None:
     """Register project tools on the MCP server."""
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Projects",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Projects"))
     async def bitbucket_get_projects(
         ctx: Context,
         name: Annotated[
@@ -46,31 +41,21 @@ def register_project_tools(mcp, get_client) -> None:
         by project name, and `permission` to filter by access level.
         """
         client: BitbucketClient = get_client(ctx)
-        params: dict = {}
-        if name:
-            params["name"] = name
-        if permission:
-            params["permission"] = permission
+        params = query_params(name=name, permission=permission)
         data = await client.get_paged(
-            "/rest/api/latest/projects", params=params, start=start, limit=limit
+            _PROJECTS, params=params, start=start, limit=limit, cacheable=True
         )
-        markdown = format_projects(
-            data.get("values", []),
-            total=data.get("size", 0),
-            is_last=data.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_projects(
+                data.get("values", []),
+                total=data.get("size", 0),
+                is_last=data.get("isLastPage", True),
+            ),
+            data,
         )
-        return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Project",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Project"))
     async def bitbucket_get_project(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key (e.g. 'PROJ')")],
@@ -81,6 +66,5 @@ def register_project_tools(mcp, get_client) -> None:
     ) -> str:
         """Get details of a specific Bitbucket project by its key."""
         client: BitbucketClient = get_client(ctx)
-        data = await client.get(f"/rest/api/latest/projects/{project_key}")
-        markdown = format_project(data)
-        return render_response(response_format, markdown, data)
+        data = await client.get(_PROJECT % project_key, cacheable=True)
+        return render_response(response_format, lambda: format_project(data), data)
@@ -1,33 +1,75 @@
 """Pull request MCP tools."""
 
-from typing import Annotated, Literal, Optional
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from typing import Annotated, Any, Literal, Optional
+from urllib.parse import quote
 
+import httpx
 from fastmcp import Context
 from pydantic import Field
 
-from ..client import BitbucketClient
+from ..client import BitbucketClient, BitbucketClientError
 from ..formatting import (
     format_pr_activities,
     format_pr_changes,
     format_pull_request_detail,
     format_pull_requests,
+    format_required_reviewers,
     render_response,
 )
+from .common import READ_TAGS, WRITE_TAGS, query_params, read_annotations, write_annotations
+
+# Endpoint templates, filled with %-formatting per call.
+_PULL_REQUESTS = "/rest/api/latest/projects/%s/repos/%s/pull-requests"
+_PULL_REQUEST = "/rest/api/latest/projects/%s/repos/%s/pull-requests/%s"
+_PR_ACTIVITIES = "/rest/api/latest/projects/%s/repos/%s/pull-requests/%s/activities"
+_PR_CHANGES = "/rest/api/latest/projects/%s/repos/%s/pull-requests/%s/changes"
+_PR_COMMENTS = "/rest/api/latest/projects/%s/repos/%s/pull-requests/%s/comments"
+_PR_DIFF = "/rest/api/latest/projects/%s/repos/%s/pull-requests/%s/diff/%s"
+_CONDITIONS = "/rest/api/latest/projects/%s/repos/%s/conditions"
+
+
+async def _collect_text(
+    chunks: AsyncIterator[str], max_chars: Optional[int]
+) -> tuple[list[str], bool]:
+    """Gather streamed text chunks, stopping early once ``max_chars`` is exceeded.
+
+    Returns the chunks read and whether the text was truncated.
+    """
+    parts: list[str] = []
+    remaining = max_chars
+    async with aclosing(chunks):
+        async for chunk in chunks:
+            if remaining is not None:
+                if len(chunk) > remaining:
+                    parts.append(chunk[:remaining])
+                    return parts, True
+                remaining -= len(chunk)
+            parts.append(chunk)
+    return parts, False
+
+
+def _conditions(data: Any) -> list[dict[str, Any]]:
+    """Normalize a reviewer-conditions response, which may be a list or a page."""
+    return data if isinstance(data, list) else data.get("values", [data])
+
+
+def _error_message(exc: BaseException) -> str:
+    """Describe a failed fetch; some httpx errors carry an empty message."""
+    return str(exc) or type(exc).__name__
+
+
+def _full_ref(ref: str) -> str:
+    """Expand a branch name to a full ref ID (``main`` → ``refs/heads/main``)."""
+    return ref if ref.startswith("refs/") else f"refs/heads/{ref}"
 
 
 def register_pull_request_tools(mcp, get_client) -> None:
     """Register pull request tools on the MCP server."""
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Pull Requests",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Pull Requests"))
     async def bitbucket_get_pull_requests(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -54,6 +96,15 @@ def register_pull_request_tools(mcp, get_client) -> None:
         ] = "markdown",
         start: Annotated[int, Field(description="Pagination start index")] = 0,
         limit: Annotated[int, Field(description="Max results (1-100)", ge=1, le=100)] = 25,
+        max_pages: Annotated[
+            int,
+            Field(
+                description="Fetch up to this many consecutive pages of `limit` results "
+                "concurrently and merge them (1-10)",
+                ge=1,
+                le=10,
+            ),
+        ] = 1,
     ) -> str:
         """List pull requests for a repository.
 
@@ -61,67 +112,144 @@ def register_pull_request_tools(mcp, get_client) -> None:
         showing OPEN pull requests ordered by newest first.
         """
         client: BitbucketClient = get_client(ctx)
-        params: dict = {}
-        if state:
-            params["state"] = state
-        if direction:
-            params["direction"] = direction
-        if order:
-            params["order"] = order
-        if filter_text:
-            params["filterText"] = filter_text
+        params = query_params(state=state, direction=direction, order=order, filterText=filter_text)
         data = await client.get_paged(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/pull-requests",
+            _PULL_REQUESTS % (project_key, repository_slug),
             params=params,
             start=start,
             limit=limit,
+            max_pages=max_pages,
+            cacheable=True,
         )
-        markdown = format_pull_requests(
-            data.get("values", []),
-            total=data.get("size", 0),
-            is_last=data.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_pull_requests(
+                data.get("values", []),
+                total=data.get("size", 0),
+                is_last=data.get("isLastPage", True),
+            ),
+            data,
         )
-        return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Pull Request",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Pull Request"))
     async def bitbucket_get_pull_request(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
         repository_slug: Annotated[str, Field(description="The repository slug")],
         pull_request_id: Annotated[int, Field(description="The pull request ID number")],
+        include_changes: Annotated[
+            bool,
+            Field(description="Also include the first page of changed files"),
+        ] = False,
+        include_activities: Annotated[
+            bool,
+            Field(description="Also include the first page of comments and activity"),
+        ] = False,
         response_format: Annotated[
             Literal["markdown", "json"],
             Field(description="Output format: markdown (default) or json"),
         ] = "markdown",
     ) -> str:
-        """Get full details of a specific pull request including description and reviewers."""
+        """Get full details of a specific pull request including description and reviewers.
+
+        Set `include_changes` / `include_activities` to fetch the changed files and
+        the activity feed in the same call; all requests are issued concurrently.
+        """
         client: BitbucketClient = get_client(ctx)
-        data = await client.get(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}"
-            f"/pull-requests/{pull_request_id}"
-        )
-        markdown = format_pull_request_detail(data)
+        pr_key = (project_key, repository_slug, pull_request_id)
+        # Never cached: callers take `version` from here for optimistic locking.
+        requests = [client.get(_PULL_REQUEST % pr_key)]
+        if include_changes:
+            requests.append(client.get_paged(_PR_CHANGES % pr_key))
+        if include_activities:
+            requests.append(client.get_paged(_PR_ACTIVITIES % pr_key))
+        pr, *pages = await asyncio.gather(*requests)
+        changes = pages.pop(0) if include_changes else None
+        activities = pages.pop(0) if include_activities else None
+
+        def markdown() -> str:
+            sections = [format_pull_request_detail(pr)]
+            if changes is not None:
+                sections.append(
+                    format_pr_changes(
+                        changes.get("values", []),
+                        total=changes.get("size", 0),
+                        is_last=changes.get("isLastPage", True),
+                    )
+                )
+            if activities is not None:
+                sections.append(
+                    format_pr_activities(
+                        activities.get("values", []),
+                        total=activities.get("size", 0),
+                        is_last=activities.get("isLastPage", True),
+                    )
+                )
+            return "\n\n".join(sections)
+
+        data = dict(pr)
+        if changes is not None:
+            data["changes"] = changes
+        if activities is not None:
+            data["activities"] = activities
+        return render_response(response_format, markdown, data)
+
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Batch Get Pull Requests"))
+    async def bitbucket_batch_get_pull_requests(
+        ctx: Context,
+        project_key: Annotated[str, Field(description="The project key")],
+        repository_slug: Annotated[str, Field(description="The repository slug")],
+        pull_request_ids: Annotated[
+            list[int],
+            Field(
+                description="Pull request ID numbers to fetch (1-50)", min_length=1, max_length=50
+            ),
+        ],
+        response_format: Annotated[
+            Literal["markdown", "json"],
+            Field(description="Output format: markdown (default) or json"),
+        ] = "markdown",
+    ) -> str:
+        """Get full details of several pull requests in one call.
+
+        All pull requests are fetched concurrently. A pull request that cannot be
+        fetched (e.g. it does not exist) is reported inline instead of failing the
+        whole batch.
+        """
+        client: BitbucketClient = get_client(ctx)
+        semaphore = asyncio.Semaphore(10)
+
+        async def fetch(pull_request_id: int) -> dict:
+            async with semaphore:
+                return await client.get(
+                    _PULL_REQUEST % (project_key, repository_slug, pull_request_id)
+                )
+
+        results = await asyncio.gather(*map(fetch, pull_request_ids), return_exceptions=True)
+        pull_requests = []
+        errors = []
+        for pull_request_id, result in zip(pull_request_ids, results):
+            # API and transport failures (timeouts, dropped connections) only
+            # affect their own PR; anything else is a bug or a cancellation.
+            if isinstance(result, (BitbucketClientError, httpx.HTTPError)):
+                errors.append({"id": pull_request_id, "error": _error_message(result)})
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                pull_requests.append(result)
+
+        def markdown() -> str:
+            return "\n\n---\n\n".join(
+                f"# PR #{pull_request_id}\n\n**Error:** {_error_message(result)}"
+                if isinstance(result, BaseException)
+                else format_pull_request_detail(result)
+                for pull_request_id, result in zip(pull_request_ids, results)
+            )
+
+        data = {"values": pull_requests, "errors": errors}
         return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get PR Comments",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get PR Comments"))
     async def bitbucket_get_pull_request_comments(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -133,6 +261,15 @@ def register_pull_request_tools(mcp, get_client) -> None:
         ] = "markdown",
         start: Annotated[int, Field(description="Pagination start index")] = 0,
         limit: Annotated[int, Field(description="Max results (1-100)", ge=1, le=100)] = 25,
+        max_pages: Annotated[
+            int,
+            Field(
+                description="Fetch up to this many consecutive pages of `limit` results "
+                "concurrently and merge them (1-10)",
+                ge=1,
+                le=10,
+            ),
+        ] = 1,
     ) -> str:
         """Get comments and activity for a pull request.
 
@@ -141,28 +278,22 @@ def register_pull_request_tools(mcp, get_client) -> None:
         """
         client: BitbucketClient = get_client(ctx)
         data = await client.get_paged(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}"
-            f"/pull-requests/{pull_request_id}/activities",
+            _PR_ACTIVITIES % (project_key, repository_slug, pull_request_id),
             start=start,
             limit=limit,
+            max_pages=max_pages,
         )
-        markdown = format_pr_activities(
-            data.get("values", []),
-            total=data.get("size", 0),
-            is_last=data.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_pr_activities(
+                data.get("values", []),
+                total=data.get("size", 0),
+                is_last=data.get("isLastPage", True),
+            ),
+            data,
         )
-        return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get PR Changes",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get PR Changes"))
     async def bitbucket_get_pull_request_changes(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -182,41 +313,43 @@ def register_pull_request_tools(mcp, get_client) -> None:
         ] = "markdown",
         start: Annotated[int, Field(description="Pagination start index")] = 0,
         limit: Annotated[int, Field(description="Max results (1-1000)", ge=1, le=1000)] = 25,
+        max_pages: Annotated[
+            int,
+            Field(
+                description="Fetch up to this many consecutive pages of `limit` results "
+                "concurrently and merge them (1-10)",
+                ge=1,
+                le=10,
+            ),
+        ] = 1,
     ) -> str:
         """Get the list of files changed in a pull request.
 
         Shows which files were added, modified, deleted, or renamed in the PR.
         """
         client: BitbucketClient = get_client(ctx)
-        params: dict = {}
-        if change_scope:
-            params["changeScope"] = change_scope
-        if with_comments is not None:
-            params["withComments"] = str(with_comments).lower()
+        params = query_params(
+            changeScope=change_scope,
+            withComments=None if with_comments is None else str(with_comments).lower(),
+        )
         data = await client.get_paged(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}"
-            f"/pull-requests/{pull_request_id}/changes",
+            _PR_CHANGES % (project_key, repository_slug, pull_request_id),
             params=params,
             start=start,
             limit=limit,
+            max_pages=max_pages,
         )
-        markdown = format_pr_changes(
-            data.get("values", []),
-            total=data.get("size", 0),
-            is_last=data.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_pr_changes(
+                data.get("values", []),
+                total=data.get("size", 0),
+                is_last=data.get("isLastPage", True),
+            ),
+            data,
         )
-        return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get PR Diff",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get PR Diff"))
     async def bitbucket_get_pull_request_diff(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -235,6 +368,12 @@ def register_pull_request_tools(mcp, get_client) -> None:
             Optional[str],
             Field(description="Whitespace handling: SHOW, IGNORE_ALL, or IGNORE_TRAILING"),
         ] = None,
+        max_chars: Annotated[
+            Optional[int],
+            Field(
+                description="Truncate the diff after this many characters (default: no limit)", ge=1
+            ),
+        ] = None,
         response_format: Annotated[
             Literal["markdown", "json"],
             Field(description="Output format: markdown (default) or json"),
@@ -245,38 +384,33 @@ def register_pull_request_tools(mcp, get_client) -> None:
         Returns the unified diff showing additions and deletions for the specified file.
         """
         client: BitbucketClient = get_client(ctx)
-        params: dict = {}
-        if context_lines is not None:
-            params["contextLines"] = context_lines
-        if diff_type:
-            params["diffType"] = diff_type
-        if whitespace:
-            params["whitespace"] = whitespace
-        raw_diff = await client.get_raw(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}"
-            f"/pull-requests/{pull_request_id}/diff/{path}",
-            params=params,
+        params = query_params(contextLines=context_lines, diffType=diff_type, whitespace=whitespace)
+        parts, truncated = await _collect_text(
+            client.stream_raw(
+                _PR_DIFF % (project_key, repository_slug, pull_request_id, quote(path)),
+                params=params,
+            ),
+            max_chars,
         )
-        markdown = f"# Diff: `{path}` (PR #{pull_request_id})\n\n```diff\n{raw_diff}\n```"
+
+        def markdown() -> str:
+            footer = (
+                f"\n```\n\n*Diff truncated after {max_chars} characters.*" if truncated else "\n```"
+            )
+            header = f"# Diff: `{path}` (PR #{pull_request_id})\n\n```diff\n"
+            return "".join([header, *parts, footer])
+
         data = {
             "project_key": project_key,
             "repository_slug": repository_slug,
             "pull_request_id": pull_request_id,
             "path": path,
-            "diff": raw_diff,
+            "diff": "".join(parts),
+            "truncated": truncated,
         }
         return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "write"},
-        annotations={
-            "title": "Post PR Comment",
-            "readOnlyHint": False,
-            "destructiveHint": True,
-            "idempotentHint": False,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=WRITE_TAGS, annotations=write_annotations("Post PR Comment"))
     async def bitbucket_post_pull_request_comment(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -317,22 +451,12 @@ def register_pull_request_tools(mcp, get_client) -> None:
                 anchor["lineType"] = line_type
             body["anchor"] = anchor
         data = await client.post(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}"
-            f"/pull-requests/{pull_request_id}/comments",
+            _PR_COMMENTS % (project_key, repository_slug, pull_request_id),
             json=body,
         )
         return f"Comment posted successfully (ID: {data.get('id', 'unknown')})"
 
-    @mcp.tool(
-        tags={"bitbucket", "write"},
-        annotations={
-            "title": "Create Pull Request",
-            "readOnlyHint": False,
-            "destructiveHint": True,
-            "idempotentHint": False,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=WRITE_TAGS, annotations=write_annotations("Create Pull Request"))
     async def bitbucket_create_pull_request(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -347,6 +471,13 @@ def register_pull_request_tools(mcp, get_client) -> None:
             Optional[list[str]],
             Field(description="List of reviewer usernames to add"),
         ] = None,
+        auto_reviewers: Annotated[
+            bool,
+            Field(
+                description="Also add the required reviewers configured for this branch "
+                "pair (saves a separate bitbucket_get_required_reviewers call)"
+            ),
+        ] = False,
     ) -> str:
         """Create a new pull request.
 
@@ -354,6 +485,20 @@ def register_pull_request_tools(mcp, get_client) -> None:
         a description and reviewers.
         """
         client: BitbucketClient = get_client(ctx)
+        if auto_reviewers:
+            data = await client.get(
+                _CONDITIONS % (project_key, repository_slug),
+                params={"sourceRefId": _full_ref(from_ref), "targetRefId": _full_ref(to_ref)},
+                cacheable=True,
+            )
+            required = [
+                r["name"]
+                for cond in _conditions(data)
+                for r in cond.get("reviewers", ())
+                if r.get("name")
+            ]
+            # Explicit reviewers first, then required ones, without duplicates.
+            reviewers = list(dict.fromkeys([*(reviewers or ()), *required]))
         body: dict = {
             "title": title,
             "fromRef": {"id": from_ref},
@@ -364,22 +509,13 @@ def register_pull_request_tools(mcp, get_client) -> None:
         if reviewers:
             body["reviewers"] = [{"user": {"name": r}} for r in reviewers]
         data = await client.post(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/pull-requests",
+            _PULL_REQUESTS % (project_key, repository_slug),
             json=body,
         )
         pr_id = data.get("id", "unknown")
         return f"Pull request created successfully (ID: #{pr_id})\n\n{format_pull_request_detail(data)}"
 
-    @mcp.tool(
-        tags={"bitbucket", "write"},
-        annotations={
-            "title": "Update Pull Request",
-            "readOnlyHint": False,
-            "destructiveHint": True,
-            "idempotentHint": False,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=WRITE_TAGS, annotations=write_annotations("Update Pull Request"))
     async def bitbucket_update_pull_request(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -405,40 +541,28 @@ def register_pull_request_tools(mcp, get_client) -> None:
         first using bitbucket_get_pull_request.
         """
         client: BitbucketClient = get_client(ctx)
-        # First get current PR to preserve required fields
-        current = await client.get(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}"
-            f"/pull-requests/{pull_request_id}"
-        )
-        body: dict = {
-            "version": version,
-            "title": title or current.get("title", ""),
-            "fromRef": current.get("fromRef", {}),
-            "toRef": current.get("toRef", {}),
-        }
+        pr_path = _PULL_REQUEST % (project_key, repository_slug, pull_request_id)
+        body: dict = {"version": version}
+        if title and reviewers is not None:
+            # Everything Bitbucket would otherwise reset is supplied by the caller,
+            # so skip the round trip for the current PR.
+            body["title"] = title
+        else:
+            # Get current PR to preserve required fields
+            current = await client.get(pr_path)
+            body["title"] = title or current.get("title", "")
+            body["fromRef"] = current.get("fromRef", {})
+            body["toRef"] = current.get("toRef", {})
+            if reviewers is None and current.get("reviewers"):
+                body["reviewers"] = current["reviewers"]
         if description is not None:
             body["description"] = description
         if reviewers is not None:
             body["reviewers"] = [{"user": {"name": r}} for r in reviewers]
-        elif current.get("reviewers"):
-            body["reviewers"] = current["reviewers"]
-        data = await client.put(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}"
-            f"/pull-requests/{pull_request_id}",
-            json=body,
-        )
+        data = await client.put(pr_path, json=body)
         return f"Pull request updated successfully.\n\n{format_pull_request_detail(data)}"
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Required Reviewers",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Required Reviewers"))
     async def bitbucket_get_required_reviewers(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key")],
@@ -457,22 +581,11 @@ def register_pull_request_tools(mcp, get_client) -> None:
         """
         client: BitbucketClient = get_client(ctx)
         data = await client.get(
-            f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}/conditions",
+            _CONDITIONS % (project_key, repository_slug),
             params={"sourceRefId": source_ref, "targetRefId": target_ref},
+            cacheable=True,
+        )
+        conditions = _conditions(data)
+        return render_response(
+            response_format, lambda: format_required_reviewers(conditions), conditions
         )
-        # Parse the conditions response
-        conditions = data if isinstance(data, list) else data.get("values", [data])
-        lines = ["# Required Reviewers\n"]
-        for cond in conditions:
-            reviewers_list = cond.get("reviewers", [])
-            for r in reviewers_list:
-                lines.append(
-                    f"- **{r.get('displayName', r.get('name', 'unknown'))}** (`{r.get('name', '')}`)"
-                )
-            required_approvals = cond.get("requiredApprovals", 0)
-            if required_approvals:
-                lines.append(f"\n*Required approvals: {required_approvals}*")
-        if len(lines) == 1:
-            lines.append("No required reviewers configured for this branch combination.")
-        markdown = "\n".join(lines)
-        return render_response(response_format, markdown, conditions)
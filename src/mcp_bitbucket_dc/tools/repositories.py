@@ -7,21 +7,16 @@ from pydantic import Field
 
 from ..client import BitbucketClient
 from ..formatting import format_repositories, format_repository_detail, render_response
+from .common import READ_TAGS, read_annotations
+
+_REPOS = "/rest/api/latest/projects/%s/repos"
+_REPO = "/rest/api/latest/projects/%s/repos/%s"
 
 
 def register_repository_tools(mcp, get_client) -> None:
     """Register repository tools on the MCP server."""
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Repositories",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Repositories"))
     async def bitbucket_get_repositories(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key (e.g. 'PROJ')")],
@@ -29,6 +24,15 @@ def register_repository_tools(mcp, get_client) -> None:
         limit: Annotated[
             int, Field(description="Max results to return (1-1000)", ge=1, le=1000)
         ] = 25,
+        max_pages: Annotated[
+            int,
+            Field(
+                description="Fetch up to this many consecutive pages of `limit` results "
+                "concurrently and merge them (1-10)",
+                ge=1,
+                le=10,
+            ),
+        ] = 1,
         response_format: Annotated[
             Literal["markdown", "json"],
             Field(description="Output format: markdown (default) or json"),
@@ -41,27 +45,23 @@ def register_repository_tools(mcp, get_client) -> None:
         """
         client: BitbucketClient = get_client(ctx)
         data = await client.get_paged(
-            f"/rest/api/latest/projects/{project_key}/repos",
+            _REPOS % project_key,
             start=start,
             limit=limit,
+            max_pages=max_pages,
+            cacheable=True,
         )
-        markdown = format_repositories(
-            data.get("values", []),
-            total=data.get("size", 0),
-            is_last=data.get("isLastPage", True),
+        return render_response(
+            response_format,
+            lambda: format_repositories(
+                data.get("values", []),
+                total=data.get("size", 0),
+                is_last=data.get("isLastPage", True),
+            ),
+            data,
         )
-        return render_response(response_format, markdown, data)
 
-    @mcp.tool(
-        tags={"bitbucket", "read"},
-        annotations={
-            "title": "Get Repository",
-            "readOnlyHint": True,
-            "destructiveHint": False,
-            "idempotentHint": True,
-            "openWorldHint": True,
-        },
-    )
+    @mcp.tool(tags=READ_TAGS, annotations=read_annotations("Get Repository"))
     async def bitbucket_get_repository(
         ctx: Context,
         project_key: Annotated[str, Field(description="The project key (e.g. 'PROJ')")],
@@ -73,6 +73,5 @@ def register_repository_tools(mcp, get_client) -> None:
     ) -> str:
         """Get details of a specific repository including clone URLs and configuration."""
         client: BitbucketClient = get_client(ctx)
-        data = await client.get(f"/rest/api/latest/projects/{project_key}/repos/{repository_slug}")
-        markdown = format_repository_detail(data)
-        return render_response(response_format, markdown, data)
+        data = await client.get(_REPO % (project_key, repository_slug), cacheable=True)
+        return render_response(response_format, lambda: format_repository_detail(data), data)
@@ -2,14 +2,74 @@
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, MagicMock
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any, Optional
 
 import pytest
 
-from mcp_bitbucket_dc.client import BitbucketClient
 from mcp_bitbucket_dc.config import BitbucketConfig
 
 
+class FakeClient:
+    """Lightweight stand-in for BitbucketClient.
+
+    Each method records ``(method, args, kwargs)`` in ``calls`` and returns the
+    canned value from ``responses[method]``. A ``deque`` there is consumed one
+    item per call, a callable is invoked with the call arguments, and an
+    exception instance is raised instead of returned. ``stream_raw`` yields the
+    canned chunks.
+    """
+
+    def __init__(self, config: Optional[BitbucketConfig] = None) -> None:
+        self.config = config
+        self.calls: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+        self.responses: dict[str, Any] = {}
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.responses.clear()
+
+    def calls_to(self, method: str) -> list[tuple[tuple[Any, ...], dict[str, Any]]]:
+        return [(args, kwargs) for name, args, kwargs in self.calls if name == method]
+
+    def _respond(self, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+        self.calls.append((method, args, kwargs))
+        response = self.responses.get(method)
+        if isinstance(response, deque):
+            response = response.popleft()
+        if callable(response):
+            response = response(*args, **kwargs)
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        return self._respond("get", args, kwargs)
+
+    async def post(self, *args: Any, **kwargs: Any) -> Any:
+        return self._respond("post", args, kwargs)
+
+    async def put(self, *args: Any, **kwargs: Any) -> Any:
+        return self._respond("put", args, kwargs)
+
+    async def delete(self, *args: Any, **kwargs: Any) -> Any:
+        return self._respond("delete", args, kwargs)
+
+    async def get_paged(self, *args: Any, **kwargs: Any) -> Any:
+        return self._respond("get_paged", args, kwargs)
+
+    async def get_paged_parallel(self, *args: Any, **kwargs: Any) -> Any:
+        return self._respond("get_paged_parallel", args, kwargs)
+
+    async def stream_raw(self, *args: Any, **kwargs: Any) -> AsyncIterator[str]:
+        for chunk in self._respond("stream_raw", args, kwargs) or ():
+            yield chunk
+
+    async def close(self) -> None:
+        self.calls.append(("close", (), {}))
+
+
 @pytest.fixture
 def config() -> BitbucketConfig:
     return BitbucketConfig(
@@ -18,16 +78,7 @@ def config() -> BitbucketConfig:
     )
 
 
-@pytest.fixture
-def mock_client(config: BitbucketConfig) -> MagicMock:
-    """A mock BitbucketClient with async methods."""
-    client = MagicMock(spec=BitbucketClient)
-    client.config = config
-    client.get = AsyncMock()
-    client.post = AsyncMock()
-    client.put = AsyncMock()
-    client.delete = AsyncMock()
-    client.get_raw = AsyncMock()
-    client.get_paged = AsyncMock()
-    client.close = AsyncMock()
-    return client
+@pytest.fixture(scope="module")
+def fake_client() -> FakeClient:
+    """A FakeClient shared by the tests of one module."""
+    return FakeClient()
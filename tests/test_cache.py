@@ -0,0 +1,45 @@
+"""Tests for the TTL response cache."""
+
+from __future__ import annotations
+
+from mcp_bitbucket_dc.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(ttl=60, clock=clock)
+    cache.set(("json", "/projects", ()), {"values": []})
+
+    clock.now = 59.9
+    assert cache.get(("json", "/projects", ())) == {"values": []}
+    clock.now = 60.0
+    assert cache.get(("json", "/projects", ())) is None
+    assert len(cache) == 0
+
+
+def test_oldest_entry_evicted_when_full():
+    cache = TTLCache(ttl=60, maxsize=2)
+    for path in ("/a", "/b", "/c"):
+        cache.set(("json", path, ()), path)
+
+    assert cache.get(("json", "/a", ())) is None
+    assert cache.get(("json", "/c", ())) == "/c"
+
+
+def test_invalidate_prefix_matches_request_path():
+    cache = TTLCache(ttl=60)
+    cache.set(("json", "/rest/api/latest/projects/PROJ/repos/r/branches", ()), 1)
+    cache.set(("json", "/rest/api/latest/projects/OTHER/repos/r/branches", ()), 2)
+
+    cache.invalidate_prefix("/rest/api/latest/projects/PROJ")
+
+    assert cache.get(("json", "/rest/api/latest/projects/PROJ/repos/r/branches", ())) is None
+    assert cache.get(("json", "/rest/api/latest/projects/OTHER/repos/r/branches", ())) == 2
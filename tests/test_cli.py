@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import sys
 import types
 
@@ -33,3 +34,42 @@ def test_cli_defaults_to_localhost_for_http_transport(monkeypatch):
     assert captured["transport"] == "streamable-http"
     assert captured["host"] == "127.0.0.1"
     assert captured["port"] == 8000
+
+
+def test_cli_uses_uvloop_for_http_transport_when_installed(monkeypatch):
+    captured: dict = {}
+
+    async def fake_run_async(**kwargs):
+        captured.update(kwargs)
+
+    def fake_uvloop_run(coro):
+        captured["loop"] = "uvloop"
+        asyncio.run(coro)
+
+    fake_server = types.SimpleNamespace(mcp=types.SimpleNamespace(run_async=fake_run_async))
+
+    monkeypatch.setitem(sys.modules, "mcp_bitbucket_dc.server", fake_server)
+    monkeypatch.setitem(sys.modules, "uvloop", types.SimpleNamespace(run=fake_uvloop_run))
+    monkeypatch.setattr(sys, "argv", ["mcp-bitbucket-dc", "--transport", "sse"])
+
+    with pytest.raises(SystemExit):
+        main()
+
+    assert captured["loop"] == "uvloop"
+    assert captured["transport"] == "sse"
+
+
+def test_cli_without_arguments_runs_stdio(monkeypatch):
+    captured: dict = {}
+
+    async def fake_run_async(**kwargs):
+        captured.update(kwargs)
+
+    fake_server = types.SimpleNamespace(mcp=types.SimpleNamespace(run_async=fake_run_async))
+
+    monkeypatch.setitem(sys.modules, "mcp_bitbucket_dc.server", fake_server)
+    monkeypatch.setattr(sys, "argv", ["mcp-bitbucket-dc"])
+
+    main()
+
+    assert captured == {"transport": "stdio"}
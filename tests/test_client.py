@@ -1,5 +1,8 @@
 """Tests for BitbucketClient error handling and request helpers."""
 
+import asyncio
+import gzip
+
 import httpx
 import pytest
 
@@ -13,6 +16,12 @@ def client() -> BitbucketClient:
     return BitbucketClient(config)
 
 
+@pytest.fixture
+def cached_client() -> BitbucketClient:
+    config = BitbucketConfig(base_url="https://git.example.com", api_token="token", cache_ttl=60)
+    return BitbucketClient(config)
+
+
 def _response(status_code: int, json_body: dict | None = None, text: str = "") -> httpx.Response:
     request = httpx.Request("GET", "https://git.example.com/rest/api/latest/test")
     if json_body is not None:
@@ -44,18 +53,27 @@ def test_check_errors_500_uses_error_messages(client: BitbucketClient):
         client._check_errors(response)
 
 
+def test_check_errors_non_json_body_uses_truncated_text(client: BitbucketClient):
+    response = _response(502, text="<html>Bad Gateway</html>" + "x" * 1000)
+    with pytest.raises(BitbucketClientError) as exc:
+        client._check_errors(response)
+    assert exc.value.status_code == 502
+    assert "<html>Bad Gateway</html>" in str(exc.value)
+    assert len(str(exc.value)) < 600
+
+
 def test_handle_response_204_returns_empty_dict(client: BitbucketClient):
     response = _response(204, text="")
     assert client._handle_response(response) == {}
 
 
-@pytest.mark.asyncio
 async def test_get_paged_merges_params(client: BitbucketClient, monkeypatch):
     captured: dict = {}
 
-    async def fake_get(path: str, params: dict | None = None):
+    async def fake_get(path: str, params: dict | None = None, cacheable: bool = False):
         captured["path"] = path
         captured["params"] = params
+        captured["cacheable"] = cacheable
         return {"ok": True}
 
     monkeypatch.setattr(client, "get", fake_get)
@@ -70,8 +88,268 @@ async def test_get_paged_merges_params(client: BitbucketClient, monkeypatch):
     assert result == {"ok": True}
     assert captured["path"] == "/rest/api/latest/projects/PROJ/repos"
     assert captured["params"] == {"filterText": "api", "start": 50, "limit": 10}
+    assert captured["cacheable"] is False
+
+
+async def test_concurrent_identical_gets_share_one_request(client: BitbucketClient, monkeypatch):
+    calls: list[tuple[str, dict | None]] = []
+
+    async def fake_get(path, params=None):
+        calls.append((path, params))
+        await asyncio.sleep(0)
+        return _response(200, {"values": [], "isLastPage": True})
+
+    monkeypatch.setattr(client._client, "get", fake_get)
+
+    results = await asyncio.gather(
+        client.get_paged("/rest/api/latest/projects", limit=10),
+        client.get_paged("/rest/api/latest/projects", limit=10),
+        client.get_paged("/rest/api/latest/projects", limit=20),
+    )
+
+    assert results[0] == results[1] == {"values": [], "isLastPage": True}
+    assert [params["limit"] for _, params in calls] == [10, 20]
+    assert client._inflight == {}
+
+
+def test_cache_is_opt_in(client: BitbucketClient, cached_client: BitbucketClient):
+    assert client._cache is None
+    assert cached_client._cache is not None
+
+
+async def test_cacheable_get_reused_until_project_write(
+    cached_client: BitbucketClient, monkeypatch
+):
+    client = cached_client
+    calls: list[str] = []
+
+    async def fake_get(path, params=None):
+        calls.append(path)
+        return _response(200, {"values": [], "isLastPage": True})
+
+    async def fake_post(path, content=None, params=None):
+        return _response(201, {"id": 1})
+
+    monkeypatch.setattr(client._client, "get", fake_get)
+    monkeypatch.setattr(client._client, "post", fake_post)
+    branches = "/rest/api/latest/projects/PROJ/repos/api/branches"
+
+    await client.get_paged(branches, cacheable=True)
+    await client.get_paged(branches, cacheable=True)
+    await client.get_paged(branches)
+    assert calls == [branches, branches]
+
+    await client.post("/rest/api/latest/projects/PROJ/repos/api/pull-requests", json={})
+    await client.get_paged(branches, cacheable=True)
+    assert calls == [branches, branches, branches]
+
+
+async def test_cacheable_post_keyed_by_body(cached_client: BitbucketClient, monkeypatch):
+    client = cached_client
+    bodies: list[bytes] = []
+
+    async def fake_post(path, content=None, params=None):
+        bodies.append(content)
+        return _response(200, {"code": {"values": [], "count": 0}})
+
+    monkeypatch.setattr(client._client, "post", fake_post)
+    search = "/rest/search/latest/search"
+
+    await client.post(search, json={"query": "a"}, cacheable=True)
+    await client.post(search, json={"query": "a"}, cacheable=True)
+    await client.post(search, json={"query": "b"}, cacheable=True)
+
+    assert bodies == [b'{"query":"a"}', b'{"query":"b"}']
+
+
+async def test_put_sends_encoded_json_body(client: BitbucketClient, monkeypatch):
+    sent: dict = {}
+
+    async def fake_put(path, content=None):
+        sent["content"] = content
+        return _response(200, {"id": 42, "version": 4})
+
+    monkeypatch.setattr(client._client, "put", fake_put)
+
+    data = await client.put(
+        "/rest/api/latest/projects/P/repos/r/pull-requests/42", json={"version": 3}
+    )
+
+    assert sent["content"] == b'{"version":3}'
+    assert data == {"id": 42, "version": 4}
+
+
+async def test_get_paged_parallel_merges_offset_pages(client: BitbucketClient, monkeypatch):
+    requested: list[tuple[int, int]] = []
+
+    async def fake_get_paged(path, params=None, start=0, limit=25, cacheable=False):
+        requested.append((start, limit))
+        values = list(range(start, min(start + limit, 2500)))
+        is_last = start + limit >= 2500
+        page = {"values": values, "isLastPage": is_last}
+        if not is_last:
+            page["nextPageStart"] = start + limit
+        return page
+
+    monkeypatch.setattr(client, "get_paged", fake_get_paged)
+
+    data = await client.get_paged_parallel("/files", start=0, limit=5000, page_size=1000)
+
+    assert sorted(requested) == [(0, 1000), (1000, 1000), (2000, 1000), (3000, 1000), (4000, 1000)]
+    assert data["values"] == list(range(2500))
+    assert data["isLastPage"] is True
+    assert "nextPageStart" not in data
+
+
+async def test_get_paged_parallel_stops_at_short_page(client: BitbucketClient, monkeypatch):
+    async def fake_get_paged(path, params=None, start=0, limit=25, cacheable=False):
+        # Server caps pages at 500 items regardless of the requested limit.
+        return {
+            "values": list(range(start, start + 500)),
+            "isLastPage": False,
+            "nextPageStart": start + 500,
+        }
+
+    monkeypatch.setattr(client, "get_paged", fake_get_paged)
+
+    data = await client.get_paged_parallel("/files", start=0, limit=2000, page_size=1000)
+
+    assert data["values"] == list(range(500))
+    assert data["isLastPage"] is False
+    assert data["nextPageStart"] == 500
+
+
+async def test_stream_raw_yields_text_and_raises_on_error(client: BitbucketClient):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/missing.py"):
+            return httpx.Response(404, json={"errors": [{"message": "gone"}]})
+        return httpx.Response(200, text="line 1\nline 2\n")
+
+    client._client = httpx.AsyncClient(
+        base_url="https://git.example.com", transport=httpx.MockTransport(handler)
+    )
+
+    chunks = [c async for c in client.stream_raw("/raw/app.py", chunk_size=4)]
+    assert "".join(chunks) == "line 1\nline 2\n"
+    assert len(chunks) > 1
+
+    with pytest.raises(BitbucketClientError, match="Not found"):
+        async for _ in client.stream_raw("/raw/missing.py"):
+            pass
+
+
+async def test_get_paged_max_pages_fetches_consecutive_pages(client: BitbucketClient, monkeypatch):
+    starts: list[int] = []
+
+    async def fake_get(path, params=None, *, cacheable=False):
+        starts.append(params["start"])
+        values = list(range(params["start"], min(params["start"] + params["limit"], 45)))
+        is_last = params["start"] + params["limit"] >= 45
+        page = {"values": values, "isLastPage": is_last}
+        if not is_last:
+            page["nextPageStart"] = params["start"] + params["limit"]
+        return page
+
+    monkeypatch.setattr(client, "get", fake_get)
+
+    data = await client.get_paged("/pull-requests", start=0, limit=20, max_pages=3)
+
+    assert sorted(starts) == [0, 20, 40]
+    assert data["values"] == list(range(45))
+    assert data["isLastPage"] is True
+
+
+async def test_get_paged_max_pages_stops_after_last_first_page(
+    client: BitbucketClient, monkeypatch
+):
+    starts: list[int] = []
+
+    async def fake_get(path, params=None, *, cacheable=False):
+        starts.append(params["start"])
+        return {"values": [1, 2, 3], "size": 3, "isLastPage": True}
+
+    monkeypatch.setattr(client, "get", fake_get)
+
+    data = await client.get_paged("/pull-requests", start=0, limit=25, max_pages=10)
+
+    assert starts == [0]
+    assert data["values"] == [1, 2, 3]
+    assert data["isLastPage"] is True
+
+
+async def test_requests_share_one_pooled_async_client(config: BitbucketConfig, monkeypatch):
+    constructed: list[httpx.AsyncClient] = []
+    original_init = httpx.AsyncClient.__init__
+
+    def counting_init(self, *args, **kwargs):
+        constructed.append(self)
+        original_init(self, *args, **kwargs)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"values": [], "isLastPage": True})
+
+    monkeypatch.setattr(httpx.AsyncClient, "__init__", counting_init)
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", handle)
+
+    async with BitbucketClient(config) as client:
+        for _ in range(3):
+            await client.get("/rest/api/latest/projects/PROJ")
+            await client.get_paged("/rest/api/latest/projects/PROJ/repos")
+            async for _ in client.stream_raw("/rest/api/latest/projects/PROJ/repos/r/raw/a.py"):
+                pass
+            await client.post("/rest/search/latest/search", json={"query": "x"})
+
+    assert constructed == [client._client]
+
+
+async def test_compressed_responses_are_negotiated_and_decoded(
+    config: BitbucketConfig, monkeypatch
+):
+    seen: dict = {}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        seen["accept_encoding"] = request.headers["Accept-Encoding"]
+        body = gzip.compress(b'{"values": [{"id": 1}], "isLastPage": true}')
+        return httpx.Response(200, headers={"Content-Encoding": "gzip"}, content=body)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", handle)
+
+    async with BitbucketClient(config) as client:
+        data = await client.get("/rest/api/latest/projects/PROJ/repos/r/pull-requests")
+
+    assert "gzip" in seen["accept_encoding"]
+    assert data == {"values": [{"id": 1}], "isLastPage": True}
 
 
-@pytest.mark.asyncio
 async def test_close_client(client: BitbucketClient):
     await client.close()
+
+
+async def test_async_context_manager_closes_client(config: BitbucketConfig):
+    async with BitbucketClient(config) as client:
+        assert not client._client.is_closed
+    assert client._client.is_closed
+
+
+def test_http2_follows_h2_availability(config: BitbucketConfig, monkeypatch):
+    import mcp_bitbucket_dc.client as client_module
+
+    monkeypatch.setattr(client_module, "_HTTP2", False)
+    transport = BitbucketClient(config)._client._transport
+
+    assert isinstance(transport, httpx.AsyncHTTPTransport)
+    assert transport._pool._http2 is False
+    assert transport._pool._max_keepalive_connections == 50
+
+
+def test_client_honours_proxy_environment(config: BitbucketConfig, monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example.com:8080")
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    monkeypatch.delenv("no_proxy", raising=False)
+
+    mounts = BitbucketClient(config)._client._mounts
+
+    assert any(
+        transport is not None and pattern.matches(httpx.URL(config.base_url))
+        for pattern, transport in mounts.items()
+    )
@@ -43,6 +43,14 @@ class TestBitbucketConfig:
         config = BitbucketConfig.from_env()
         assert config.base_url == "https://git.example.com"
 
+    def test_from_env_upgrades_http_host_to_https(self, monkeypatch):
+        monkeypatch.setenv("BITBUCKET_HOST", "http://git.example.com:7990/")
+        monkeypatch.setenv("BITBUCKET_API_TOKEN", "my-token")
+        monkeypatch.delenv("BITBUCKET_URL", raising=False)
+
+        config = BitbucketConfig.from_env()
+        assert config.base_url == "https://git.example.com:7990"
+
     def test_from_env_missing_token(self, monkeypatch):
         monkeypatch.setenv("BITBUCKET_HOST", "git.example.com")
         monkeypatch.delenv("BITBUCKET_API_TOKEN", raising=False)
@@ -57,3 +65,18 @@ class TestBitbucketConfig:
 
         with pytest.raises(ValueError, match="BITBUCKET_URL or BITBUCKET_HOST"):
             BitbucketConfig.from_env()
+
+    def test_from_env_cache_ttl(self, monkeypatch):
+        monkeypatch.setenv("BITBUCKET_HOST", "git.example.com")
+        monkeypatch.setenv("BITBUCKET_API_TOKEN", "my-token")
+        monkeypatch.delenv("BITBUCKET_URL", raising=False)
+
+        monkeypatch.delenv("BITBUCKET_CACHE_TTL", raising=False)
+        assert BitbucketConfig.from_env().cache_ttl == 0.0
+
+        monkeypatch.setenv("BITBUCKET_CACHE_TTL", "30")
+        assert BitbucketConfig.from_env().cache_ttl == 30.0
+
+        monkeypatch.setenv("BITBUCKET_CACHE_TTL", "soon")
+        with pytest.raises(ValueError, match="BITBUCKET_CACHE_TTL"):
+            BitbucketConfig.from_env()
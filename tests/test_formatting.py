@@ -4,11 +4,27 @@ from __future__ import annotations
 
 from mcp_bitbucket_dc.formatting import (
     format_browse,
+    format_commits,
     format_projects,
+    format_pull_request_detail,
+    format_required_reviewers,
     format_search_results,
+    render_response,
 )
 
 
+class TestRenderResponse:
+    def test_json_skips_markdown_factory(self):
+        def fail() -> str:
+            raise AssertionError("markdown should not be built for json output")
+
+        assert render_response("json", fail, {"ok": True}) == '{\n  "ok": true\n}'
+
+    def test_markdown_accepts_string_or_factory(self):
+        assert render_response("markdown", "# Title", {}) == "# Title"
+        assert render_response("markdown", lambda: "# Lazy", {}) == "# Lazy"
+
+
 class TestFormatProjects:
     def test_formats_project_list(self):
         projects = [
@@ -26,6 +42,64 @@ class TestFormatProjects:
         assert "More projects available" in result
 
 
+class TestFormatCommits:
+    def test_formats_first_message_line_only(self):
+        commits = [
+            {
+                "id": "1234567890abcdef",
+                "displayId": "",
+                "message": "fix: handle empty pages\n\nLonger body text.",
+                "author": {"name": "dev"},
+                "authorTimestamp": 1700000000000,
+            }
+        ]
+        result = format_commits(commits, total=1, is_last=True)
+        assert "`1234567890ab` 2023-11-14 22:13 UTC **dev** — fix: handle empty pages" in result
+        assert "Longer body text" not in result
+
+
+class TestFormatPullRequestDetail:
+    def test_formats_reviewers_and_defaults(self):
+        pr = {
+            "id": 7,
+            "title": "feat: {braces} stay literal",
+            "state": "OPEN",
+            "author": {"user": {"name": "dev"}},
+            "fromRef": {"displayId": "feature/x"},
+            "reviewers": [
+                {"user": {"displayName": "Reviewer"}, "approved": True},
+                {"user": {"name": "other"}, "status": "NEEDS_WORK"},
+            ],
+        }
+        result = format_pull_request_detail(pr)
+        assert result.startswith("# PR #7 — feat: {braces} stay literal\n")
+        assert "- **Branch:** `feature/x` → `?`" in result
+        assert "No description." in result
+        assert "## Reviewers (2)\n\n  - Reviewer ✅ Approved\n  - other (NEEDS_WORK)" in result
+
+    def test_no_reviewers(self):
+        assert format_pull_request_detail({}).endswith("No reviewers assigned.")
+
+
+class TestFormatRequiredReviewers:
+    def test_lists_reviewers_and_required_approvals(self):
+        conditions = [
+            {
+                "reviewers": [{"displayName": "Alice", "name": "alice"}, {"name": "bob"}],
+                "requiredApprovals": 1,
+            }
+        ]
+        assert format_required_reviewers(conditions) == (
+            "# Required Reviewers\n\n- **Alice** (`alice`)\n- **bob** (`bob`)\n\n"
+            "*Required approvals: 1*"
+        )
+
+    def test_no_conditions(self):
+        assert format_required_reviewers([]).endswith(
+            "No required reviewers configured for this branch combination."
+        )
+
+
 class TestFormatSearchResults:
     def test_formats_search_hit(self):
         results = [
@@ -42,6 +116,33 @@ class TestFormatSearchResults:
         assert "PROJ" in md
         assert "public class App {" in md  # HTML tags stripped
 
+    def test_decodes_entities_in_a_single_pass(self):
+        results = [
+            {
+                "repository": {"name": "backend", "project": {"key": "PROJ"}},
+                "file": "src/util.h",
+                "hitContexts": [
+                    [{"line": 1, "text": "if (a &lt; b &amp;&amp; <em>c</em>) &amp;lt;"}]
+                ],
+            }
+        ]
+        md = format_search_results(results, query="c", total=1, is_last=True)
+        assert "if (a < b && c) &lt;" in md
+
+    def test_groups_nearby_hits_into_sorted_blocks(self):
+        results = [
+            {
+                "repository": {"name": "backend", "project": {"key": "PROJ"}},
+                "file": "src/app.py",
+                "hitContexts": [
+                    [{"line": 40, "text": "far"}],
+                    [{"line": 12, "text": "second"}, {"line": 10, "text": "first"}],
+                ],
+            }
+        ]
+        md = format_search_results(results, query="x", total=1, is_last=True)
+        assert "  10    first\n  12    second\n```\n\n---\n\n```\n  40    far" in md
+
     def test_empty_results(self):
         md = format_search_results([], query="nothing", total=0, is_last=True)
         assert "0" in md
@@ -64,3 +165,25 @@ class TestFormatBrowse:
         assert "README.md" in result
         assert "📁" in result
         assert "📄" in result
+        assert "- 📄 `README.md` (1.0 KB)" in result
+
+    def test_directory_listing_sizes_and_name_fallback(self):
+        data = {
+            "children": {
+                "values": [
+                    {"path": {"name": "small.txt"}, "type": "FILE", "size": 12},
+                    {"path": {"toString": "big.bin"}, "type": "FILE", "size": 3 * 1024 * 1024},
+                    {"path": {"toString": "unknown"}, "type": "FILE"},
+                ],
+            }
+        }
+        result = format_browse(data, path="")
+        assert "# Browse: `/` (3 entries)" in result
+        assert "- 📄 `small.txt` (12 B)" in result
+        assert "- 📄 `big.bin` (3.0 MB)" in result
+        assert result.endswith("- 📄 `unknown`")
+
+    def test_file_content(self):
+        data = {"lines": [{"text": "def main():"}, {}, {"text": "    pass"}]}
+        result = format_browse(data, path="src/app.py")
+        assert result == "# File: `src/app.py`\n\n```\ndef main():\n\n    pass\n```"
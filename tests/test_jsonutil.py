@@ -0,0 +1,36 @@
+"""Tests for the orjson/stdlib JSON helpers."""
+
+from __future__ import annotations
+
+import pytest
+
+from mcp_bitbucket_dc import jsonutil
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if jsonutil.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(jsonutil, "orjson", None)
+    return request.param
+
+
+def test_loads_accepts_bytes(backend):
+    assert jsonutil.loads(b'{"values": [1, 2], "isLastPage": true}') == {
+        "values": [1, 2],
+        "isLastPage": True,
+    }
+
+
+def test_dumps_pretty_matches_indented_stdlib_output(backend):
+    assert jsonutil.dumps_pretty({"name": "Åsa", "ids": [1]}) == (
+        '{\n  "name": "Åsa",\n  "ids": [\n    1\n  ]\n}'
+    )
+
+
+def test_dumps_is_compact_utf8(backend):
+    assert jsonutil.dumps({"query": "Åsa", "limits": {"primary": 25}}) == (
+        '{"query":"Åsa","limits":{"primary":25}}'.encode()
+    )
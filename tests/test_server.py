@@ -0,0 +1,46 @@
+"""Tests for the server lifespan."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from mcp_bitbucket_dc import server
+from mcp_bitbucket_dc.client import BitbucketClient, BitbucketClientError
+
+
+@pytest.fixture
+def bitbucket_env(monkeypatch):
+    monkeypatch.setenv("BITBUCKET_URL", "https://git.example.com")
+    monkeypatch.setenv("BITBUCKET_API_TOKEN", "token")
+
+
+async def test_lifespan_prewarms_connection_and_clears_client(bitbucket_env, monkeypatch):
+    paths: list[str] = []
+
+    async def fake_get(self, path, params=None, *, cacheable=False):
+        paths.append(path)
+        return {}
+
+    monkeypatch.setattr(BitbucketClient, "get", fake_get)
+
+    async with server.lifespan(server.mcp):
+        assert isinstance(server.get_client(None), BitbucketClient)
+        await asyncio.sleep(0)
+
+    assert paths == ["/rest/api/latest/application-properties"]
+    with pytest.raises(RuntimeError):
+        server.get_client(None)
+
+
+async def test_lifespan_prewarm_failure_only_logs(bitbucket_env, monkeypatch, caplog):
+    async def failing_get(self, path, params=None, *, cacheable=False):
+        raise BitbucketClientError(401, "Authentication failed")
+
+    monkeypatch.setattr(BitbucketClient, "get", failing_get)
+
+    async with server.lifespan(server.mcp):
+        await asyncio.sleep(0)
+
+    assert "Preflight request to https://git.example.com failed" in caplog.text
@@ -0,0 +1,19 @@
+"""Tests for helpers shared by the tool modules."""
+
+from mcp_bitbucket_dc.tools.common import query_params, read_annotations, write_annotations
+
+
+def test_query_params_drops_unset_values():
+    assert query_params(details="true", filterText=None, orderBy="") == {"details": "true"}
+    assert query_params(at=None) == {}
+    assert query_params(contextLines=0) == {"contextLines": 0}
+
+
+def test_annotations_are_fresh_dicts_with_title():
+    first = read_annotations("Get Projects")
+    second = read_annotations("Get Tags")
+
+    assert first["title"] == "Get Projects"
+    assert first["readOnlyHint"] is True
+    assert first is not second
+    assert write_annotations("Create Pull Request")["destructiveHint"] is True
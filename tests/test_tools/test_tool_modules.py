@@ -1,10 +1,13 @@
 """Tool-level tests for MCP tool modules with mocked API responses."""
 
 import json
-from unittest.mock import AsyncMock, MagicMock
+from collections import deque
+from unittest.mock import MagicMock
 
+import httpx
 import pytest
 
+from mcp_bitbucket_dc.client import BitbucketClientError
 from mcp_bitbucket_dc.tools.code_search import register_code_search_tools
 from mcp_bitbucket_dc.tools.commits import register_commit_tools
 from mcp_bitbucket_dc.tools.files import register_file_tools
@@ -19,6 +22,7 @@ class FakeMCP:
     def __init__(self):
         self.tools = {}
         self.tool_kwargs = {}
+        self.client = None
 
     def tool(self, *args, **kwargs):
         def decorator(fn):
@@ -29,254 +33,437 @@ class FakeMCP:
         return decorator
 
 
-@pytest.fixture
-def fake_client():
-    client = MagicMock()
-    client.get = AsyncMock()
-    client.post = AsyncMock()
-    client.put = AsyncMock()
-    client.get_raw = AsyncMock()
-    client.get_paged = AsyncMock()
-    return client
+@pytest.fixture(scope="session")
+def registered():
+    """Register each tool module once and point it at the given client."""
+    cache = {}
 
+    def build(register_fn, client):
+        mcp = cache.get(register_fn)
+        if mcp is None:
+            mcp = cache[register_fn] = FakeMCP()
+            register_fn(mcp, lambda _ctx: mcp.client)
+        mcp.client = client
+        return mcp
 
-@pytest.mark.asyncio
-async def test_projects_module_tools(fake_client):
-    mcp = FakeMCP()
-    register_project_tools(mcp, lambda _ctx: fake_client)
-
-    fake_client.get_paged.return_value = {
-        "values": [{"name": "Platform", "key": "PLAT", "public": False}],
-        "size": 1,
-        "isLastPage": True,
-    }
+    return build
 
-    result = await mcp.tools["bitbucket_get_projects"](ctx=object())
 
-    assert "Projects" in result
-    assert "Platform" in result
-    fake_client.get_paged.assert_awaited_once()
+_REGISTER_FNS = (
+    register_project_tools,
+    register_repository_tools,
+    register_commit_tools,
+    register_code_search_tools,
+    register_file_tools,
+    register_pull_request_tools,
+)
 
 
-@pytest.mark.asyncio
-async def test_projects_module_tools_json_response(fake_client):
+@pytest.fixture(scope="session")
+def all_tool_kwargs():
+    """Decorator kwargs of every registered tool, keyed by tool name."""
     mcp = FakeMCP()
-    register_project_tools(mcp, lambda _ctx: fake_client)
-
-    fake_client.get_paged.return_value = {
-        "values": [{"name": "Platform", "key": "PLAT", "public": False}],
-        "size": 1,
+    for register_fn in _REGISTER_FNS:
+        register_fn(mcp, lambda _ctx: MagicMock())
+    return mcp.tool_kwargs
+
+
+@pytest.fixture(autouse=True)
+def _reset_fake_client(fake_client):
+    yield
+    fake_client.reset()
+
+
+_CTX = object()
+_REQUIRED_ANNOTATIONS = frozenset(
+    {"readOnlyHint", "destructiveHint", "idempotentHint", "openWorldHint"}
+)
+_REPO = {"project_key": "PLAT", "repository_slug": "backend"}
+
+# Canned API responses, shared by every test that needs them; tools never mutate them.
+_PROJECTS_PAYLOAD = {
+    "values": [{"name": "Platform", "key": "PLAT", "public": False}],
+    "size": 1,
+    "isLastPage": True,
+}
+_REPOSITORY_PAYLOAD = {
+    "name": "backend",
+    "slug": "backend",
+    "state": "AVAILABLE",
+    "forkable": True,
+    "public": False,
+    "archived": False,
+    "project": {"name": "Platform", "key": "PLAT"},
+}
+_COMMITS_PAYLOAD = {
+    "values": [
+        {
+            "id": "1234567890abcdef",
+            "displayId": "1234567890ab",
+            "message": "feat: add endpoint",
+            "author": {"name": "dev"},
+            "authorTimestamp": 1700000000000,
+        }
+    ],
+    "size": 1,
+    "isLastPage": True,
+}
+_CODE_SEARCH_PAYLOAD = {
+    "code": {
+        "values": [
+            {
+                "repository": {"name": "backend", "project": {"key": "PLAT"}},
+                "file": "src/main/App.java",
+                "hitCount": 1,
+                "hitContexts": [[{"line": 10, "text": "class <em>App</em>"}]],
+            }
+        ],
+        "count": 1,
         "isLastPage": True,
     }
+}
+_FILE_CHUNKS = ("print(", "'hello')")
+_PULL_REQUESTS_PAYLOAD = {
+    "values": [
+        {
+            "id": 42,
+            "state": "OPEN",
+            "title": "feat: improve search",
+            "updatedDate": 1700000000000,
+            "author": {"user": {"displayName": "Dev User"}},
+            "fromRef": {"displayId": "feature/search"},
+            "toRef": {"displayId": "main"},
+        }
+    ],
+    "size": 1,
+    "isLastPage": True,
+}
+
+# (id, register_fn, tool_name, client_method, response, tool_kwargs, expected_substrings)
+MODULE_CASES = [
+    (
+        "projects",
+        register_project_tools,
+        "bitbucket_get_projects",
+        "get_paged",
+        _PROJECTS_PAYLOAD,
+        {},
+        ["Projects", "Platform"],
+    ),
+    (
+        "repositories",
+        register_repository_tools,
+        "bitbucket_get_repository",
+        "get",
+        _REPOSITORY_PAYLOAD,
+        _REPO,
+        ["backend"],
+    ),
+    (
+        "commits",
+        register_commit_tools,
+        "bitbucket_get_commits",
+        "get_paged",
+        _COMMITS_PAYLOAD,
+        _REPO,
+        ["Commits", "feat: add endpoint"],
+    ),
+    (
+        "code_search",
+        register_code_search_tools,
+        "bitbucket_code_search",
+        "post",
+        _CODE_SEARCH_PAYLOAD,
+        {"query": "App"},
+        ["Search Results", "src/main/App.java"],
+    ),
+    (
+        "files",
+        register_file_tools,
+        "bitbucket_get_file_content",
+        "stream_raw",
+        _FILE_CHUNKS,
+        {**_REPO, "path": "src/app.py"},
+        ["# File: `src/app.py`\n\n```py\nprint('hello')\n```"],
+    ),
+    (
+        "pull_requests",
+        register_pull_request_tools,
+        "bitbucket_get_pull_requests",
+        "get_paged",
+        _PULL_REQUESTS_PAYLOAD,
+        _REPO,
+        ["Pull Requests", "feat: improve search"],
+    ),
+]
+
+
+# (id, register_fn, tool_name, client_method, response, tool_kwargs, expected_fields)
+JSON_CASES = [
+    (
+        "projects",
+        register_project_tools,
+        "bitbucket_get_projects",
+        "get_paged",
+        _PROJECTS_PAYLOAD,
+        {},
+        {"values": _PROJECTS_PAYLOAD["values"], "size": 1},
+    ),
+    (
+        "code_search",
+        register_code_search_tools,
+        "bitbucket_code_search",
+        "post",
+        _CODE_SEARCH_PAYLOAD,
+        {"query": "App"},
+        {"values": _CODE_SEARCH_PAYLOAD["code"]["values"], "count": 1},
+    ),
+    (
+        "files",
+        register_file_tools,
+        "bitbucket_get_file_content",
+        "stream_raw",
+        _FILE_CHUNKS,
+        {**_REPO, "path": "src/app.py"},
+        {"path": "src/app.py", "content": "print('hello')"},
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "register_fn, tool_name, method, response, kwargs, expected",
+    [case[1:] for case in MODULE_CASES],
+    ids=[case[0] for case in MODULE_CASES],
+)
+async def test_module_tools(
+    registered, fake_client, register_fn, tool_name, method, response, kwargs, expected
+):
+    mcp = registered(register_fn, fake_client)
+    fake_client.responses[method] = response
+
+    result = await mcp.tools[tool_name](ctx=_CTX, **kwargs)
+
+    for text in expected:
+        assert text in result
+    assert len(fake_client.calls_to(method)) == 1
+
+
+@pytest.mark.parametrize(
+    "register_fn, tool_name, method, response, kwargs, expected",
+    [case[1:] for case in JSON_CASES],
+    ids=[case[0] for case in JSON_CASES],
+)
+async def test_module_tools_json_response(
+    registered, fake_client, register_fn, tool_name, method, response, kwargs, expected
+):
+    mcp = registered(register_fn, fake_client)
+    fake_client.responses[method] = response
+
+    payload = json.loads(await mcp.tools[tool_name](ctx=_CTX, response_format="json", **kwargs))
+
+    assert {key: payload[key] for key in expected} == expected
+
+
+async def test_pull_request_detail_fetches_extras_concurrently(registered, fake_client):
+    mcp = registered(register_pull_request_tools, fake_client)
+
+    fake_client.responses["get"] = {"id": 42, "title": "feat: improve search", "reviewers": []}
+    fake_client.responses["get_paged"] = deque(
+        [
+            {"values": [{"path": {"toString": "src/search.py"}, "type": "MODIFY"}], "size": 1},
+            {"values": [{"action": "APPROVED", "user": {"displayName": "Reviewer"}}], "size": 1},
+        ]
+    )
 
-    result = await mcp.tools["bitbucket_get_projects"](ctx=object(), response_format="json")
-    payload = json.loads(result)
-
-    assert payload["values"][0]["key"] == "PLAT"
-    assert payload["size"] == 1
-
-
-@pytest.mark.asyncio
-async def test_repositories_module_tools(fake_client):
-    mcp = FakeMCP()
-    register_repository_tools(mcp, lambda _ctx: fake_client)
-
-    fake_client.get.return_value = {
-        "name": "backend",
-        "slug": "backend",
-        "state": "AVAILABLE",
-        "forkable": True,
-        "public": False,
-        "archived": False,
-        "project": {"name": "Platform", "key": "PLAT"},
-    }
-
-    result = await mcp.tools["bitbucket_get_repository"](
-        ctx=object(),
+    result = await mcp.tools["bitbucket_get_pull_request"](
+        ctx=_CTX,
         project_key="PLAT",
         repository_slug="backend",
+        pull_request_id=42,
+        include_changes=True,
+        include_activities=True,
     )
 
-    assert "backend" in result
-    fake_client.get.assert_awaited_once()
+    assert "# PR #42" in result
+    assert "src/search.py" in result
+    assert "APPROVED" in result
+    assert fake_client.calls_to("get")[0][1] == {}
+    paths = [args[0] for args, _ in fake_client.calls_to("get_paged")]
+    assert paths[0].endswith("/pull-requests/42/changes")
+    assert paths[1].endswith("/pull-requests/42/activities")
 
 
-@pytest.mark.asyncio
-async def test_commits_module_tools(fake_client):
-    mcp = FakeMCP()
-    register_commit_tools(mcp, lambda _ctx: fake_client)
+async def test_update_pull_request_skips_fetch_when_fields_supplied(registered, fake_client):
+    mcp = registered(register_pull_request_tools, fake_client)
+    fake_client.responses["put"] = {"id": 42, "title": "New title", "reviewers": []}
 
-    fake_client.get_paged.return_value = {
-        "values": [
-            {
-                "id": "1234567890abcdef",
-                "displayId": "1234567890ab",
-                "message": "feat: add endpoint",
-                "author": {"name": "dev"},
-                "authorTimestamp": 1700000000000,
-            }
-        ],
-        "size": 1,
-        "isLastPage": True,
-    }
-
-    result = await mcp.tools["bitbucket_get_commits"](
-        ctx=object(),
+    await mcp.tools["bitbucket_update_pull_request"](
+        ctx=_CTX,
         project_key="PLAT",
         repository_slug="backend",
+        pull_request_id=42,
+        version=3,
+        title="New title",
+        reviewers=["alice"],
     )
 
-    assert "Commits" in result
-    assert "feat: add endpoint" in result
-    fake_client.get_paged.assert_awaited_once()
+    assert fake_client.calls_to("get") == []
+    body = fake_client.calls_to("put")[0][1]["json"]
+    assert body == {"version": 3, "title": "New title", "reviewers": [{"user": {"name": "alice"}}]}
 
 
-@pytest.mark.asyncio
-async def test_code_search_module_tools(fake_client):
-    mcp = FakeMCP()
-    register_code_search_tools(mcp, lambda _ctx: fake_client)
-
-    fake_client.post.return_value = {
-        "code": {
-            "values": [
-                {
-                    "repository": {"name": "backend", "project": {"key": "PLAT"}},
-                    "file": "src/main/App.java",
-                    "hitCount": 1,
-                    "hitContexts": [[{"line": 10, "text": "class <em>App</em>"}]],
-                }
-            ],
-            "count": 1,
-            "isLastPage": True,
-        }
+async def test_update_pull_request_empty_title_keeps_current_title(registered, fake_client):
+    mcp = registered(register_pull_request_tools, fake_client)
+    fake_client.responses["get"] = {
+        "title": "Old title",
+        "fromRef": {"id": "refs/heads/feature"},
+        "toRef": {"id": "refs/heads/main"},
     }
+    fake_client.responses["put"] = {"id": 42, "title": "Old title", "reviewers": []}
 
-    result = await mcp.tools["bitbucket_code_search"](ctx=object(), query="App")
+    await mcp.tools["bitbucket_update_pull_request"](
+        ctx=_CTX,
+        project_key="PLAT",
+        repository_slug="backend",
+        pull_request_id=42,
+        version=3,
+        title="",
+        reviewers=["alice"],
+    )
 
-    assert "Search Results" in result
-    assert "src/main/App.java" in result
-    fake_client.post.assert_awaited_once()
+    body = fake_client.calls_to("put")[0][1]["json"]
+    assert body["title"] == "Old title"
+    assert body["reviewers"] == [{"user": {"name": "alice"}}]
 
 
-@pytest.mark.asyncio
-async def test_code_search_module_tools_json_response(fake_client):
-    mcp = FakeMCP()
-    register_code_search_tools(mcp, lambda _ctx: fake_client)
-
-    fake_client.post.return_value = {
-        "code": {
-            "values": [
-                {
-                    "repository": {"name": "backend", "project": {"key": "PLAT"}},
-                    "file": "src/main/App.java",
-                    "hitCount": 1,
-                    "hitContexts": [[{"line": 10, "text": "class <em>App</em>"}]],
-                }
-            ],
-            "count": 1,
-            "isLastPage": True,
-        }
+async def test_update_pull_request_preserves_current_fields(registered, fake_client):
+    mcp = registered(register_pull_request_tools, fake_client)
+    fake_client.responses["get"] = {
+        "title": "Old title",
+        "fromRef": {"id": "refs/heads/feature"},
+        "toRef": {"id": "refs/heads/main"},
+        "reviewers": [{"user": {"name": "bob"}}],
     }
+    fake_client.responses["put"] = {"id": 42, "title": "Old title", "reviewers": []}
 
-    result = await mcp.tools["bitbucket_code_search"](
-        ctx=object(), query="App", response_format="json"
+    await mcp.tools["bitbucket_update_pull_request"](
+        ctx=_CTX,
+        project_key="PLAT",
+        repository_slug="backend",
+        pull_request_id=42,
+        version=3,
+        description="Updated",
     )
-    payload = json.loads(result)
 
-    assert payload["count"] == 1
-    assert payload["values"][0]["file"] == "src/main/App.java"
+    body = fake_client.calls_to("put")[0][1]["json"]
+    assert body["title"] == "Old title"
+    assert body["toRef"] == {"id": "refs/heads/main"}
+    assert body["reviewers"] == [{"user": {"name": "bob"}}]
+    assert body["description"] == "Updated"
 
 
-@pytest.mark.asyncio
-async def test_files_module_tools(fake_client):
-    mcp = FakeMCP()
-    register_file_tools(mcp, lambda _ctx: fake_client)
+async def test_batch_get_pull_requests_reports_failures_inline(registered, fake_client):
+    mcp = registered(register_pull_request_tools, fake_client)
+
+    def fake_get(path, params=None, *, cacheable=False):
+        if path.endswith("/pull-requests/404"):
+            raise BitbucketClientError(404, "Not found: pull request 404")
+        return {"id": int(path.rsplit("/", 1)[-1]), "title": "feat", "reviewers": []}
 
-    fake_client.get_raw.return_value = "print('hello')"
+    fake_client.responses["get"] = fake_get
 
-    result = await mcp.tools["bitbucket_get_file_content"](
-        ctx=object(),
+    result = await mcp.tools["bitbucket_batch_get_pull_requests"](
+        ctx=_CTX,
         project_key="PLAT",
         repository_slug="backend",
-        path="src/app.py",
+        pull_request_ids=[1, 404, 2],
     )
 
-    assert "# File: `src/app.py`" in result
-    assert "print('hello')" in result
-    fake_client.get_raw.assert_awaited_once()
+    sections = result.split("\n\n---\n\n")
+    assert len(sections) == 3
+    assert sections[0].startswith("# PR #1 ")
+    assert (
+        sections[1]
+        == "# PR #404\n\n**Error:** Bitbucket API error (404): Not found: pull request 404"
+    )
+    assert sections[2].startswith("# PR #2 ")
+    assert len(fake_client.calls_to("get")) == 3
 
 
-@pytest.mark.asyncio
-async def test_files_module_tools_json_response(fake_client):
-    mcp = FakeMCP()
-    register_file_tools(mcp, lambda _ctx: fake_client)
+async def test_batch_get_pull_requests_reports_timeouts_inline(registered, fake_client):
+    mcp = registered(register_pull_request_tools, fake_client)
 
-    fake_client.get_raw.return_value = "print('hello')"
+    def fake_get(path, params=None, *, cacheable=False):
+        if path.endswith("/pull-requests/2"):
+            raise httpx.ReadTimeout("")
+        return {"id": int(path.rsplit("/", 1)[-1]), "title": "feat", "reviewers": []}
 
-    result = await mcp.tools["bitbucket_get_file_content"](
-        ctx=object(),
+    fake_client.responses["get"] = fake_get
+
+    result = await mcp.tools["bitbucket_batch_get_pull_requests"](
+        ctx=_CTX,
         project_key="PLAT",
         repository_slug="backend",
-        path="src/app.py",
+        pull_request_ids=[1, 2, 3],
         response_format="json",
     )
     payload = json.loads(result)
 
-    assert payload["path"] == "src/app.py"
-    assert payload["content"] == "print('hello')"
+    assert [pr["id"] for pr in payload["values"]] == [1, 3]
+    assert payload["errors"] == [{"id": 2, "error": "ReadTimeout"}]
 
 
-@pytest.mark.asyncio
-async def test_pull_requests_module_tools(fake_client):
-    mcp = FakeMCP()
-    register_pull_request_tools(mcp, lambda _ctx: fake_client)
+async def test_pull_request_diff_streams_and_truncates(registered, fake_client):
+    mcp = registered(register_pull_request_tools, fake_client)
+    diff_tool = mcp.tools["bitbucket_get_pull_request_diff"]
+    args = {"project_key": "PLAT", "repository_slug": "backend", "pull_request_id": 42}
 
-    fake_client.get_paged.return_value = {
-        "values": [
-            {
-                "id": 42,
-                "state": "OPEN",
-                "title": "feat: improve search",
-                "updatedDate": 1700000000000,
-                "author": {"user": {"displayName": "Dev User"}},
-                "fromRef": {"displayId": "feature/search"},
-                "toRef": {"displayId": "main"},
-            }
-        ],
-        "size": 1,
-        "isLastPage": True,
-    }
+    fake_client.responses["stream_raw"] = ("-old\n", "+new")
+    result = await diff_tool(ctx=_CTX, path="docs/read me#1.md", **args)
+    assert result == "# Diff: `docs/read me#1.md` (PR #42)\n\n```diff\n-old\n+new\n```"
+    url = fake_client.calls_to("stream_raw")[0][0][0]
+    assert url.endswith("/pull-requests/42/diff/docs/read%20me%231.md")
+
+    payload = json.loads(
+        await diff_tool(ctx=_CTX, path="app.py", max_chars=6, response_format="json", **args)
+    )
+    assert payload["diff"] == "-old\n+"
+    assert payload["truncated"] is True
+
+
+async def test_create_pull_request_adds_required_reviewers(registered, fake_client):
+    mcp = registered(register_pull_request_tools, fake_client)
+    fake_client.responses["get"] = [
+        {"reviewers": [{"name": "alice"}, {"name": "bob"}], "requiredApprovals": 1}
+    ]
+    fake_client.responses["post"] = {"id": 7, "title": "feat", "reviewers": []}
 
-    result = await mcp.tools["bitbucket_get_pull_requests"](
-        ctx=object(),
+    await mcp.tools["bitbucket_create_pull_request"](
+        ctx=_CTX,
         project_key="PLAT",
         repository_slug="backend",
+        title="feat",
+        from_ref="feature/x",
+        to_ref="main",
+        reviewers=["bob", "carol"],
+        auto_reviewers=True,
     )
 
-    assert "Pull Requests" in result
-    assert "feat: improve search" in result
-    fake_client.get_paged.assert_awaited_once()
+    params = fake_client.calls_to("get")[0][1]["params"]
+    assert params == {"sourceRefId": "refs/heads/feature/x", "targetRefId": "refs/heads/main"}
+    body = fake_client.calls_to("post")[0][1]["json"]
+    assert [r["user"]["name"] for r in body["reviewers"]] == ["bob", "carol", "alice"]
 
 
-def test_tool_annotations_include_required_hints():
-    mcp = FakeMCP()
-    register_project_tools(mcp, lambda _ctx: MagicMock())
-    register_repository_tools(mcp, lambda _ctx: MagicMock())
-    register_commit_tools(mcp, lambda _ctx: MagicMock())
-    register_code_search_tools(mcp, lambda _ctx: MagicMock())
-    register_file_tools(mcp, lambda _ctx: MagicMock())
-    register_pull_request_tools(mcp, lambda _ctx: MagicMock())
-
-    required = {"readOnlyHint", "destructiveHint", "idempotentHint", "openWorldHint"}
-    for tool_name, kwargs in mcp.tool_kwargs.items():
+def test_tool_annotations_include_required_hints(all_tool_kwargs):
+    for tool_name, kwargs in all_tool_kwargs.items():
         annotations = kwargs.get("annotations", {})
-        assert required.issubset(annotations.keys()), f"Missing annotation keys for {tool_name}"
-
+        assert _REQUIRED_ANNOTATIONS <= annotations.keys(), (
+            f"Missing annotation keys for {tool_name}"
+        )
 
-def test_write_tools_have_non_readonly_annotations():
-    mcp = FakeMCP()
-    register_pull_request_tools(mcp, lambda _ctx: MagicMock())
 
+def test_write_tools_have_non_readonly_annotations(all_tool_kwargs):
     write_tools = [
         "bitbucket_post_pull_request_comment",
         "bitbucket_create_pull_request",
@@ -284,8 +471,21 @@ def test_write_tools_have_non_readonly_annotations():
     ]
 
     for tool_name in write_tools:
-        annotations = mcp.tool_kwargs[tool_name]["annotations"]
+        annotations = all_tool_kwargs[tool_name]["annotations"]
         assert annotations["readOnlyHint"] is False
         assert annotations["destructiveHint"] is True
         assert annotations["idempotentHint"] is False
         assert annotations["openWorldHint"] is True
+
+
+def test_registration_is_cheap(benchmark):
+    def register_all():
+        mcp = FakeMCP()
+        for register_fn in _REGISTER_FNS:
+            register_fn(mcp, lambda _ctx: None)
+
+    benchmark(register_all)
+
+    # Registering every tool takes a few milliseconds; an order of magnitude more
+    # means something heavy crept into module import or tool decoration.
+    assert benchmark.stats.stats.median < 0.05